@@ -0,0 +1,276 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+from models import db, Corridas, Reservas, AsientosReservados, AsientosBloqueados
+
+# --- Control de admisión por corrida (picos de venta) ---
+# Antes de tocar la BD, cada request de bloqueo/reserva:
+#   1. Se rechaza al instante (409 + Retry-After) si la corrida ya está llena o si
+#      sus asientos ya están tomados, según una foto de la ocupación en memoria.
+#   2. Entra a una cola FIFO por corrida; sólo N requests por corrida trabajan en la
+#      BD a la vez. Quien espera turno ocupa un hilo del worker, así que en todo el
+#      proceso sólo pueden esperar ADMISION_ESPERAS_MAX requests a la vez (una fracción
+#      de los hilos de gunicorn). Si no hay lugar o la espera vence: 503 + Retry-After.
+# La foto se recarga cada ADMISION_TTL_SEGUNDOS, un solo hilo a la vez por corrida (los
+# demás usan la foto anterior), y los bloqueos/reservas de este worker la actualizan al
+# momento (notificar_bloqueo / notificar_reserva). El estado es por proceso.
+
+
+class _EstadoCorrida:
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.activos = 0
+        self.cola = deque()
+        # Foto de ocupación
+        self.capacidad = None
+        self.reservados = set()
+        self.bloqueados = {}  # asiento -> expira_en (UTC naive)
+        self.cargado_en = None
+        self.cargando = False
+        self.usado_en = time.monotonic()
+
+    def inactivo(self, ahora, segundos):
+        return not self.activos and not self.cola and not self.cargando and ahora - self.usado_en > segundos
+
+
+_estados = {}
+_estados_lock = threading.Lock()
+_barrido_en = 0.0
+
+# Requests esperando turno en todo el proceso (cualquier corrida)
+_esperando = 0
+_esperando_lock = threading.Lock()
+
+
+def _estado(corrida_id, inactivo_segundos):
+    """Estado de la corrida; de paso descarta las corridas sin actividad reciente."""
+    global _barrido_en
+    ahora = time.monotonic()
+    with _estados_lock:
+        if ahora - _barrido_en > inactivo_segundos / 10:
+            _barrido_en = ahora
+            for cid in [cid for cid, e in _estados.items() if e.inactivo(ahora, inactivo_segundos)]:
+                del _estados[cid]
+        estado = _estados.get(corrida_id)
+        if estado is None:
+            estado = _estados[corrida_id] = _EstadoCorrida()
+        estado.usado_en = ahora
+        return estado
+
+
+def _olvidar(corrida_id, estado):
+    with _estados_lock:
+        if _estados.get(corrida_id) is estado:
+            del _estados[corrida_id]
+
+
+def _ahora_utc():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _utc_naive(fecha):
+    return fecha.astimezone(timezone.utc).replace(tzinfo=None) if fecha.tzinfo else fecha
+
+
+def _cargar_ocupacion(corrida_id, estado):
+    capacidad = db.session.query(Corridas.capacidad_total).filter(Corridas.id == corrida_id).scalar()
+    reservados, bloqueados = [], []
+    if capacidad is not None:
+        reservados = db.session.query(AsientosReservados.numero_asiento)\
+            .join(Reservas)\
+            .filter(Reservas.corrida_id == corrida_id).all()
+        bloqueados = db.session.query(AsientosBloqueados.numero_asiento, AsientosBloqueados.expira_en)\
+            .filter(
+                AsientosBloqueados.corrida_id == corrida_id,
+                AsientosBloqueados.expira_en > datetime.now(timezone.utc)
+            ).all()
+    with estado.cond:
+        estado.capacidad = capacidad
+        estado.reservados = {a for (a,) in reservados}
+        estado.bloqueados = {a: _utc_naive(e) for a, e in bloqueados}
+        estado.cargado_en = time.monotonic()
+
+
+def _asegurar_cargada(corrida_id, estado):
+    """
+    Recarga la foto si venció. Si otro hilo ya la está recargando no se espera:
+    se usa la foto anterior (o ninguna, la primera vez; la BD decide).
+    """
+    with estado.cond:
+        vigente = estado.cargado_en is not None and \
+            time.monotonic() - estado.cargado_en <= current_app.config['ADMISION_TTL_SEGUNDOS']
+        if vigente or estado.cargando:
+            return
+        estado.cargando = True
+    try:
+        _cargar_ocupacion(corrida_id, estado)
+    finally:
+        with estado.cond:
+            estado.cargando = False
+
+
+def invalidar(corrida_id):
+    """Fuerza a recargar la ocupación en el siguiente request (la foto no cuadró con la BD)."""
+    estado = _estados.get(corrida_id)
+    if estado is not None:
+        estado.cargado_en = None
+
+
+def notificar_bloqueo(corrida_id, asientos, expira_en):
+    """Bloqueo confirmado en la BD: la foto lo refleja sin esperar a la recarga."""
+    estado = _estados.get(int(corrida_id))
+    if estado is None:
+        return
+    expira_en = _utc_naive(expira_en)
+    with estado.cond:
+        for asiento in asientos:
+            estado.bloqueados[asiento] = expira_en
+
+
+def notificar_reserva(corrida_id, asientos):
+    """Reserva confirmada en la BD: la foto la refleja sin esperar a la recarga."""
+    estado = _estados.get(int(corrida_id))
+    if estado is None:
+        return
+    with estado.cond:
+        estado.reservados.update(asientos)
+
+
+def _rechazo_rapido(estado, asientos, contar_bloqueos):
+    """
+    Devuelve los segundos para el Retry-After si el request no puede tener éxito, o None.
+    La reserva (/api/reservar) no cuenta los bloqueos: el cliente reserva los que él bloqueó.
+    """
+    ahora = _ahora_utc()
+    with estado.cond:
+        if estado.capacidad is None:
+            return None
+        bloqueados = {a: e for a, e in estado.bloqueados.items() if e > ahora} if contar_bloqueos else {}
+        ocupados = estado.reservados | set(bloqueados)
+        if not (set(asientos) & ocupados) and len(ocupados) + len(asientos) <= estado.capacidad:
+            return None
+        if bloqueados:
+            # Lo más pronto que se puede liberar algo es cuando vence el primer bloqueo
+            return max(1, int((min(bloqueados.values()) - ahora).total_seconds()) + 1)
+        return current_app.config['ADMISION_REINTENTO_AGOTADA_SEGUNDOS']
+
+
+def _entrar(estado, limite, esperas_max, espera):
+    """
+    Espera turno en orden de llegada. False si ya hay esperas_max requests esperando
+    en el proceso o si vence la espera.
+    """
+    global _esperando
+    with estado.cond:
+        if estado.activos < limite and not estado.cola:
+            estado.activos += 1
+            return True
+        with _esperando_lock:
+            if _esperando >= esperas_max:
+                return False
+            _esperando += 1
+        try:
+            turno = object()
+            estado.cola.append(turno)
+            fin = time.monotonic() + espera
+            while not (estado.cola[0] is turno and estado.activos < limite):
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    estado.cola.remove(turno)
+                    estado.cond.notify_all()
+                    return False
+                estado.cond.wait(restante)
+            estado.cola.popleft()
+            estado.activos += 1
+            estado.cond.notify_all()
+            return True
+        finally:
+            with _esperando_lock:
+                _esperando -= 1
+
+
+def _salir(estado):
+    with estado.cond:
+        estado.activos -= 1
+        estado.cond.notify_all()
+
+
+def _respuesta(mensaje, status, retry_after):
+    response = jsonify({'error': mensaje})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def admision_corrida(campo_asientos, contar_bloqueos):
+    """
+    Decorador para los endpoints de compra. 'campo_asientos' es la llave del JSON con los
+    asientos pedidos ('asientos' = lista de números, 'pasajeros' = lista con 'asiento').
+    """
+    def decorador(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            if not config['ADMISION_ACTIVA']:
+                return f(*args, **kwargs)
+            data = request.get_json(silent=True) or {}
+            corrida_id = data.get('corrida_id')
+            pedidos = data.get(campo_asientos)
+            if not corrida_id or not isinstance(pedidos, list):
+                # Datos incompletos: que el endpoint responda su 400
+                return f(*args, **kwargs)
+            try:
+                corrida_id = int(corrida_id)
+                asientos = [p['asiento'] if isinstance(p, dict) else p for p in pedidos]
+            except (TypeError, ValueError, KeyError):
+                return f(*args, **kwargs)
+
+            estado = _estado(corrida_id, config['ADMISION_INACTIVA_SEGUNDOS'])
+            _asegurar_cargada(corrida_id, estado)
+            if estado.cargado_en is not None and estado.capacidad is None:
+                # La corrida no existe: no se guarda estado y el endpoint responde
+                _olvidar(corrida_id, estado)
+                return f(*args, **kwargs)
+
+            retry_after = _rechazo_rapido(estado, asientos, contar_bloqueos)
+            if retry_after is not None:
+                return _respuesta('Lo sentimos, uno o más asientos ya no están disponibles.', 409, retry_after)
+
+            if not _entrar(estado, config['ADMISION_CONCURRENCIA_POR_CORRIDA'],
+                           config['ADMISION_ESPERAS_MAX'], config['ADMISION_ESPERA_SEGUNDOS']):
+                return _respuesta('Demasiadas solicitudes para esta corrida, intenta de nuevo.', 503,
+                                  config['ADMISION_REINTENTO_SEGUNDOS'])
+            try:
+                # Mientras esperábamos pudieron venderse los asientos
+                _asegurar_cargada(corrida_id, estado)
+                retry_after = _rechazo_rapido(estado, asientos, contar_bloqueos)
+                if retry_after is not None:
+                    return _respuesta('Lo sentimos, uno o más asientos ya no están disponibles.', 409, retry_after)
+                resultado = f(*args, **kwargs)
+            finally:
+                _salir(estado)
+
+            status = resultado[1] if isinstance(resultado, tuple) else getattr(resultado, 'status_code', 200)
+            if status == 409:
+                # La BD vio algo que la foto no tenía (otro worker): recargar
+                invalidar(corrida_id)
+            return resultado
+        return wrapper
+    return decorador
+
+
+def configurar_admision(app):
+    app.config.setdefault('ADMISION_ACTIVA', True)
+    app.config.setdefault('ADMISION_CONCURRENCIA_POR_CORRIDA', 2)
+    app.config.setdefault('ADMISION_ESPERAS_MAX', 1)
+    app.config.setdefault('ADMISION_ESPERA_SEGUNDOS', 2)
+    app.config.setdefault('ADMISION_TTL_SEGUNDOS', 2)
+    app.config.setdefault('ADMISION_INACTIVA_SEGUNDOS', 600)
+    app.config.setdefault('ADMISION_REINTENTO_SEGUNDOS', 2)
+    app.config.setdefault('ADMISION_REINTENTO_AGOTADA_SEGUNDOS', 60)
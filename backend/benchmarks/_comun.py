@@ -0,0 +1,57 @@
+"""
+Utilidades de los benchmarks. Se corren desde backend/:
+
+    python benchmarks/bench_reportes.py --help
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+# app.py construye la app global al importarse: que no intente conectarse a Postgres
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+
+def crear_app_sqlite(**config):
+    """App sobre un archivo SQLite temporal con las tablas creadas."""
+    from app import create_app
+    from models import db
+
+    ruta = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+    base = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta}',
+        'JWT_SECRET_KEY': 'clave-de-benchmark-suficientemente-larga',
+        'LOG_MUESTREO_EXITOS': 0,
+        'LOG_NIVEL': 'CRITICAL',  # los 409/503 del benchmark se cuentan en sus resultados, no en el log
+    }
+    app = create_app({**base, **config})
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def medir(fn, repeticiones, calentamiento=1):
+    """Corre fn() y devuelve la duración de cada corrida en ms."""
+    for _ in range(calentamiento):
+        fn()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def imprimir(titulo, tiempos_ms):
+    print(f'{titulo:<42} n={len(tiempos_ms):<5} '
+          f'p50={statistics.median(tiempos_ms):9.2f} ms  '
+          f'p95={percentil(tiempos_ms, 95):9.2f} ms  '
+          f'max={max(tiempos_ms):9.2f} ms')
@@ -0,0 +1,127 @@
+"""
+Pico de ventas sobre una corrida: control de admisión encendido vs. apagado.
+
+Simula un worker de gunicorn (un pool de --hilos hilos) que recibe requests de bloqueo
+a ritmo constante (lazo abierto): la mayoría para una corrida "caliente" de 19 asientos y
+el resto (--frio) para otras corridas con lugar. Cada sentencia SQL tarda además
+--latencia-sql-ms, como un viaje de red a Postgres. La latencia se mide desde que el
+request "llega", así que incluye la espera por un hilo libre.
+
+    python benchmarks/bench_admision.py [--hilos 4 --requests 1500 --tasa 300]
+
+Goodput = respuestas definitivas (200 o 409) en menos de --slo-ms, por segundo.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from _comun import crear_app_sqlite, percentil
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import admision
+from models import db, Rutas, Corridas
+
+CALIENTE = 1
+FRIAS = range(2, 22)
+
+_latencia_sql = 0.0
+
+
+def _demorar_sentencia(conn, cursor, statement, parameters, context, executemany):
+    if _latencia_sql:
+        time.sleep(_latencia_sql)
+
+
+def preparar(activa, hilos):
+    app = crear_app_sqlite(
+        ADMISION_ACTIVA=activa,
+        ADMISION_ESPERAS_MAX=max(1, hilos // 4),
+        SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 30}},
+    )
+    salida = datetime.utcnow() + timedelta(days=2)
+    with app.app_context():
+        db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+        db.session.add(Corridas(id=CALIENTE, ruta_id=1, precio=Decimal('450'), capacidad_total=19,
+                                fecha_hora_salida=salida))
+        for corrida_id in FRIAS:
+            db.session.add(Corridas(id=corrida_id, ruta_id=1, precio=Decimal('450'), capacidad_total=100000,
+                                    fecha_hora_salida=salida))
+        db.session.commit()
+    admision._estados.clear()
+    return app
+
+
+def correr(app, args, rng):
+    pedidos = []
+    for i in range(args.requests):
+        if rng.random() < args.frio:
+            # Corridas con lugar: asientos que nadie más pide
+            pedidos.append(('fria', rng.choice(FRIAS), [1000 + i]))
+        else:
+            pedidos.append(('caliente', CALIENTE, rng.sample(range(1, 20), rng.randint(1, 2))))
+
+    resultados = []
+    lock = threading.Lock()
+
+    def atender(tipo, corrida_id, asientos, llegada):
+        status = app.test_client().post('/api/bloquear-asientos',
+                                        json={'corrida_id': corrida_id, 'asientos': asientos}).status_code
+        with lock:
+            resultados.append((tipo, status, time.perf_counter() - llegada))
+
+    intervalo = 1 / args.tasa
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+        for i, (tipo, corrida_id, asientos) in enumerate(pedidos):
+            llegada = inicio + i * intervalo
+            espera = llegada - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            pool.submit(atender, tipo, corrida_id, asientos, llegada)
+    return resultados, time.perf_counter() - inicio
+
+
+def reportar(titulo, resultados, duracion, slo):
+    print(f'\n== {titulo} ({duracion:.1f} s) ==')
+    utiles = sum(1 for _, status, lat in resultados if status in (200, 409) and lat < slo)
+    print(f'goodput: {utiles / duracion:.1f} resp/s ({utiles}/{len(resultados)} definitivas en < {slo * 1000:.0f} ms)')
+    for tipo in ('caliente', 'fria'):
+        filas = [(s, lat * 1000) for t, s, lat in resultados if t == tipo]
+        if not filas:
+            continue
+        conteo = Counter(s for s, _ in filas)
+        lat = [l for _, l in filas]
+        print(f'  {tipo:<9} n={len(filas):<4} ' + ' '.join(f'{s}={n}' for s, n in sorted(conteo.items())) +
+              f'  p50={percentil(lat, 50):7.1f} ms  p95={percentil(lat, 95):7.1f} ms  p99={percentil(lat, 99):7.1f} ms')
+
+
+def main():
+    global _latencia_sql
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hilos', type=int, default=4, help='hilos del worker (GUNICORN_THREADS)')
+    parser.add_argument('--requests', type=int, default=1500)
+    parser.add_argument('--tasa', type=float, default=300, help='requests por segundo que llegan')
+    parser.add_argument('--frio', type=float, default=0.2, help='fracción para otras corridas')
+    parser.add_argument('--latencia-sql-ms', type=float, default=5)
+    parser.add_argument('--slo-ms', type=float, default=1000)
+    args = parser.parse_args()
+
+    _latencia_sql = args.latencia_sql_ms / 1000
+    event.listen(Engine, 'before_cursor_execute', _demorar_sentencia)
+    print(f'{args.requests} requests a {args.tasa:.0f}/s, {args.hilos} hilos, '
+          f'{args.latencia_sql_ms:.0f} ms por sentencia SQL, {args.frio:.0%} a corridas frías')
+    for activa in (False, True):
+        app = preparar(activa, args.hilos)
+        resultados, duracion = correr(app, args, random.Random(1))
+        reportar(f'admisión {"encendida" if activa else "apagada"}', resultados, duracion, args.slo_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
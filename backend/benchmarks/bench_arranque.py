@@ -0,0 +1,71 @@
+"""
+Arranque del backend: tiempo de 'import app' y latencia del primer request.
+
+Cada medición es un proceso nuevo (el import sólo cuesta la primera vez). Compara la
+carga perezosa actual (stripe/qrcode/fpdf se importan en el primer pago/PDF) contra
+importarlos al arrancar, como antes.
+
+    python benchmarks/bench_arranque.py [--corridas 10] [--max-import-ms 800]
+
+Con --max-import-ms sale con código 1 si la mediana de 'import app' lo rebasa
+(sirve como chequeo en CI).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from _comun import BACKEND
+
+CODIGO = '''
+import json, time
+t0 = time.perf_counter()
+{precarga}
+import app
+t1 = time.perf_counter()
+respuesta = app.app.test_client().get('/api/test')
+assert respuesta.status_code == 200
+t2 = time.perf_counter()
+import stripe, qrcode, fpdf
+t3 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'primer_request': t2 - t1, 'diferidos': t3 - t2}}))
+'''
+
+MODOS = {
+    'perezoso (actual)': '',
+    'stripe/qrcode/fpdf al arrancar': 'import stripe, qrcode, fpdf',
+}
+
+
+def medir_proceso(precarga):
+    entorno = {**os.environ, 'DATABASE_URL': 'sqlite://', 'LOG_MUESTREO_EXITOS': '0'}
+    salida = subprocess.run([sys.executable, '-c', CODIGO.format(precarga=precarga)], cwd=BACKEND,
+                            env=entorno, capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corridas', type=int, default=10, help='procesos por modo')
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    medianas = {}
+    for modo, precarga in MODOS.items():
+        medir_proceso(precarga)  # calienta el cache de disco / .pyc
+        muestras = [medir_proceso(precarga) for _ in range(args.corridas)]
+        medianas[modo] = {k: statistics.median(m[k] for m in muestras) * 1000 for k in muestras[0]}
+        m = medianas[modo]
+        print(f'{modo:<32} import app={m["import"]:7.1f} ms  primer request={m["primer_request"]:6.1f} ms  '
+              f'import diferido restante={m["diferidos"]:6.1f} ms')
+
+    actual = medianas['perezoso (actual)']['import']
+    if args.max_import_ms is not None and actual > args.max_import_ms:
+        print(f'import app tardó {actual:.1f} ms (máximo {args.max_import_ms:.0f} ms)')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Planificador de viajes (/api/itinerarios) sobre una red grande.
+
+Siembra en SQLite cientos de paradas, miles de rutas y decenas de miles de salidas
+futuras, construye el grafo y mide búsquedas entre pares de paradas al azar.
+
+    python benchmarks/bench_itinerarios.py [--paradas 300 --rutas 1200 --salidas 30000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from _comun import crear_app_sqlite, imprimir, medir
+
+from models import db, Usuarios, Rutas, Corridas, Reservas, AsientosReservados, AsientosBloqueados
+from itinerarios import GrafoItinerarios, asientos_libres, obtener_grafo, planear_viaje
+
+
+def sembrar(paradas, rutas, salidas, dias, rng):
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None)
+    pares = set()
+    while len(pares) < rutas:
+        a, b = rng.sample(range(paradas), 2)
+        pares.add((a, b))
+    db.session.execute(Rutas.__table__.insert(), [
+        {'id': i, 'origen': f'Parada {a}', 'destino': f'Parada {b}',
+         'duracion_estimada_min': rng.randint(30, 300)}
+        for i, (a, b) in enumerate(sorted(pares), start=1)
+    ])
+    db.session.execute(Corridas.__table__.insert(), [
+        {'id': i, 'ruta_id': rng.randint(1, rutas),
+         'fecha_hora_salida': ahora + timedelta(minutes=rng.randint(60, dias * 24 * 60)),
+         'precio': Decimal('300.00'), 'capacidad_total': 19}
+        for i in range(1, salidas + 1)
+    ])
+    # Ocupación: cada corrida con una reserva de 2 asientos y un asiento bloqueado
+    db.session.execute(Usuarios.__table__.insert(), [{'id': 1, 'nombre_completo': 'Bench', 'telefono': '0'}])
+    db.session.execute(Reservas.__table__.insert(), [
+        {'id': i, 'codigo_reserva': f'PT-{i}', 'corrida_id': i, 'usuario_id': 1, 'estado_pago': 'pagado'}
+        for i in range(1, salidas + 1)
+    ])
+    db.session.execute(AsientosReservados.__table__.insert(), [
+        {'reserva_id': i, 'numero_asiento': a, 'nombre_pasajero': 'Pasajero'}
+        for i in range(1, salidas + 1) for a in (1, 2)
+    ])
+    db.session.execute(AsientosBloqueados.__table__.insert(), [
+        {'corrida_id': i, 'numero_asiento': 3, 'expira_en': ahora + timedelta(minutes=5)}
+        for i in range(1, salidas + 1)
+    ])
+    db.session.commit()
+    return ahora
+
+
+def asientos_libres_con_in(corrida_ids, capacidades):
+    """La versión anterior: asientos de cada corrida por una lista IN de ids, contados en Python."""
+    ocupados = {cid: set() for cid in corrida_ids}
+    reservados = db.session.query(Reservas.corrida_id, AsientosReservados.numero_asiento)\
+        .join(AsientosReservados, AsientosReservados.reserva_id == Reservas.id)\
+        .filter(Reservas.corrida_id.in_(corrida_ids)).all()
+    bloqueados = db.session.query(AsientosBloqueados.corrida_id, AsientosBloqueados.numero_asiento)\
+        .filter(
+            AsientosBloqueados.corrida_id.in_(corrida_ids),
+            AsientosBloqueados.expira_en > datetime.now(timezone.utc)
+        ).all()
+    for corrida_id, asiento in reservados + bloqueados:
+        ocupados[corrida_id].add(asiento)
+    return {cid: (capacidades.get(cid) or 0) - len(ocupados[cid]) for cid in corrida_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--paradas', type=int, default=300)
+    parser.add_argument('--rutas', type=int, default=1200)
+    parser.add_argument('--salidas', type=int, default=30000)
+    parser.add_argument('--dias', type=int, default=3, help='horizonte de las salidas')
+    parser.add_argument('--ventana-horas', type=int, default=12)
+    parser.add_argument('--busquedas', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    app = crear_app_sqlite()
+    with app.app_context():
+        ahora = sembrar(args.paradas, args.rutas, args.salidas, args.dias, rng)
+        print(f'Sembrado: {args.paradas} paradas, {args.rutas} rutas, {args.salidas} salidas en {args.dias} días')
+
+        grafo = GrafoItinerarios()
+        imprimir('construir el grafo (cargar)', medir(grafo.cargar, 3))
+
+        ventana = timedelta(hours=args.ventana_horas)
+        consultas = [
+            (f'Parada {a}', f'Parada {b}', ahora + timedelta(hours=rng.randint(1, args.dias * 24 - args.ventana_horas)))
+            for a, b in (rng.sample(range(args.paradas), 2) for _ in range(args.busquedas))
+        ]
+        capacidades = [grafo.capacidades_en_ventana(desde, desde + ventana) for _, _, desde in consultas]
+        print(f'Corridas por ventana de {args.ventana_horas} h: ~{sum(map(len, capacidades)) // len(capacidades)}')
+
+        # Sólo la búsqueda en memoria (asientos libres = capacidad)
+        tiempos, encontradas = [], 0
+        for (origen, destino, desde), libres in zip(consultas, capacidades):
+            inicio = time.perf_counter()
+            encontradas += bool(grafo.buscar(origen, destino, desde, desde + ventana, libres))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        imprimir('buscar (en memoria, 3 tramos)', tiempos)
+        print(f'  con itinerario: {encontradas}/{len(consultas)}')
+
+        # Lo que hace el endpoint: ventana + asientos libres en la BD + búsqueda
+        obtener_grafo(3600)  # el grafo del proceso, ya construido (no se mide la carga)
+        tiempos = []
+        for origen, destino, desde in consultas:
+            inicio = time.perf_counter()
+            planear_viaje(origen, destino, desde, ventana, 1, timedelta(minutes=30), 3, ttl_segundos=3600)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        imprimir('planear_viaje (con asientos_libres)', tiempos)
+
+        desde = consultas[0][2]
+        assert asientos_libres(desde, desde + ventana, capacidades[0]) == \
+            asientos_libres_con_in(list(capacidades[0]), capacidades[0])
+        imprimir('asientos_libres anterior (IN de ids)',
+                 medir(lambda: asientos_libres_con_in(list(capacidades[0]), capacidades[0]), 20))
+        imprimir('asientos_libres (join por ventana)',
+                 medir(lambda: asientos_libres(desde, desde + ventana, capacidades[0]), 20))
+
+
+if __name__ == '__main__':
+    main()
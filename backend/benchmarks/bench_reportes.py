@@ -0,0 +1,117 @@
+"""
+Reporte de ventas: join sobre las tablas crudas vs. los rollups (resumen_ventas_diario).
+
+Siembra un año de corridas/reservas/asientos en SQLite y mide el reporte semanal de
+todo el año calculado de las dos formas.
+
+    python benchmarks/bench_reportes.py [--rutas 20 --corridas-dia 4 --reservas 5]
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from _comun import crear_app_sqlite, imprimir, medir
+
+from sqlalchemy import func
+
+from models import db, Usuarios, Rutas, Corridas, Reservas, AsientosReservados
+from reportes import consultar_resumen, dia_local, inicio_dia_utc, recalcular_resumen
+
+
+def sembrar(rutas, corridas_dia, reservas_por_corrida, inicio):
+    rng = random.Random(1)
+    db.session.execute(Usuarios.__table__.insert(), [{'id': 1, 'nombre_completo': 'Bench', 'telefono': '0'}])
+    db.session.execute(Rutas.__table__.insert(), [
+        {'id': r, 'origen': f'Parada {r}', 'destino': f'Parada {r + 1}', 'duracion_estimada_min': 120}
+        for r in range(1, rutas + 1)
+    ])
+    corridas, reservas, asientos = [], [], []
+    for dia in range(365):
+        for ruta_id in range(1, rutas + 1):
+            for k in range(corridas_dia):
+                corrida_id = len(corridas) + 1
+                salida = datetime.combine(inicio + timedelta(days=dia), datetime.min.time()) + timedelta(hours=6 + 4 * k)
+                corridas.append({'id': corrida_id, 'ruta_id': ruta_id, 'fecha_hora_salida': salida,
+                                 'precio': Decimal('450.00'), 'capacidad_total': 19})
+                siguiente_asiento = 1
+                for _ in range(reservas_por_corrida):
+                    reserva_id = len(reservas) + 1
+                    pagada = rng.random() < 0.8
+                    n = rng.randint(1, 3)
+                    reservas.append({
+                        'id': reserva_id, 'codigo_reserva': f'PT-{reserva_id}', 'corrida_id': corrida_id,
+                        'usuario_id': 1, 'estado_pago': 'pagado' if pagada else 'pendiente',
+                        'total_pagado': Decimal(450 * n) if pagada else None, 'fecha_creacion': salida,
+                    })
+                    for _ in range(n):
+                        asientos.append({'reserva_id': reserva_id, 'numero_asiento': siguiente_asiento,
+                                         'nombre_pasajero': 'Pasajero'})
+                        siguiente_asiento += 1
+    db.session.execute(Corridas.__table__.insert(), corridas)
+    db.session.execute(Reservas.__table__.insert(), reservas)
+    db.session.execute(AsientosReservados.__table__.insert(), asientos)
+    db.session.commit()
+    return len(corridas), len(reservas), len(asientos)
+
+
+def reporte_crudo(desde, hasta):
+    """El mismo reporte semanal, agregando directo de corridas/reservas/asientos."""
+    asientos_por_reserva = db.session.query(
+        AsientosReservados.reserva_id, func.count(AsientosReservados.id).label('n')
+    ).group_by(AsientosReservados.reserva_id).subquery()
+    filas = db.session.query(
+        Corridas.id, Corridas.ruta_id, Corridas.fecha_hora_salida, Corridas.capacidad_total,
+        Reservas.estado_pago, asientos_por_reserva.c.n, Reservas.total_pagado,
+    ).outerjoin(Reservas, Reservas.corrida_id == Corridas.id)\
+        .outerjoin(asientos_por_reserva, asientos_por_reserva.c.reserva_id == Reservas.id)\
+        .filter(Corridas.fecha_hora_salida >= inicio_dia_utc(desde),
+                Corridas.fecha_hora_salida < inicio_dia_utc(hasta + timedelta(days=1)))\
+        .all()
+    resultado, vistas = {}, set()
+    for corrida_id, ruta_id, salida, capacidad, estado, n, total in filas:
+        dia = dia_local(salida)
+        clave = (ruta_id, dia - timedelta(days=dia.weekday()))
+        item = resultado.setdefault(clave, {'capacidad_ofrecida': 0, 'asientos_vendidos': 0, 'ingresos': 0})
+        if corrida_id not in vistas:
+            vistas.add(corrida_id)
+            item['capacidad_ofrecida'] += capacidad or 0
+        if estado == 'pagado':
+            item['asientos_vendidos'] += n or 0
+            item['ingresos'] += total or 0
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rutas', type=int, default=20)
+    parser.add_argument('--corridas-dia', type=int, default=4)
+    parser.add_argument('--reservas', type=int, default=5, help='reservas por corrida')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    app = crear_app_sqlite()
+    inicio = date(2025, 1, 1)
+    desde, hasta = inicio, inicio + timedelta(days=364)
+    with app.app_context():
+        corridas, reservas, asientos = sembrar(args.rutas, args.corridas_dia, args.reservas, inicio)
+        print(f'Sembrado: {corridas} corridas, {reservas} reservas, {asientos} asientos (365 días)')
+
+        buckets = recalcular_resumen()
+        db.session.commit()
+        print(f'Rollups: {buckets} filas (ruta, día)')
+
+        crudo = reporte_crudo(desde, hasta)
+        rollup = consultar_resumen(desde, hasta, agrupar='semana')
+        assert len(crudo) == len(rollup), (len(crudo), len(rollup))
+        assert sum(i['asientos_vendidos'] for i in crudo.values()) == sum(i['asientos_vendidos'] for i in rollup)
+
+        imprimir('join crudo, año por semana', medir(lambda: reporte_crudo(desde, hasta), args.repeticiones))
+        imprimir('rollups, año por semana', medir(lambda: consultar_resumen(desde, hasta, agrupar='semana'),
+                                                   args.repeticiones))
+        imprimir('recalcular_resumen (todo el año)', medir(lambda: (recalcular_resumen(), db.session.rollback()),
+                                                            args.repeticiones))
+
+
+if __name__ == '__main__':
+    main()
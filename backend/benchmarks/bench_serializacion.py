@@ -0,0 +1,113 @@
+"""
+Serialización de listas grandes (10k filas) a JSON.
+
+Compara la forma anterior (entidades del ORM + isoformat()/str() fila por fila + json de
+la stdlib con llaves ordenadas) contra la actual (tuplas de columnas + ProveedorJSON con
+orjson, y su respaldo con la stdlib), primero sólo el dump y luego el endpoint completo
+/api/admin/corridas.
+
+    python benchmarks/bench_serializacion.py [--filas 10000]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from _comun import crear_app_sqlite, imprimir, medir
+
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended import create_access_token
+
+import serializacion
+from models import db, Usuarios, Rutas, Corridas
+from serializacion import ProveedorJSON
+
+INICIO = datetime(2026, 1, 1, 6, 0)
+
+
+def sembrar(filas):
+    db.session.execute(Usuarios.__table__.insert(), [
+        {'id': 1, 'nombre_completo': 'Admin', 'telefono': '0', 'rol': 'admin'}
+    ])
+    db.session.execute(Rutas.__table__.insert(), [
+        {'id': r, 'origen': f'Origen {r}', 'destino': f'Destino {r}', 'duracion_estimada_min': 120}
+        for r in range(1, 21)
+    ])
+    db.session.execute(Corridas.__table__.insert(), [
+        {'id': i, 'ruta_id': i % 20 + 1, 'fecha_hora_salida': INICIO + timedelta(hours=i),
+         'precio': Decimal('450.00'), 'capacidad_total': 19}
+        for i in range(1, filas + 1)
+    ])
+    db.session.commit()
+
+
+def lista_anterior():
+    """Como estaba get_todas_corridas antes: entidades + join + formato fila por fila."""
+    corridas_db = db.session.query(Corridas, Rutas.origen, Rutas.destino)\
+        .join(Rutas, Corridas.ruta_id == Rutas.id)\
+        .order_by(Corridas.fecha_hora_salida.desc()).all()
+    lista = [{
+        'id': corrida.id,
+        'ruta_nombre': f"{origen} → {destino}",
+        'fecha_hora_salida': corrida.fecha_hora_salida.replace(tzinfo=timezone.utc).isoformat(),
+        'precio': str(corrida.precio),
+        'capacidad': corrida.capacidad_total,
+    } for corrida, origen, destino in corridas_db]
+    db.session.expunge_all()
+    return lista
+
+
+def lista_actual():
+    """Como get_todas_corridas ahora: columnas sueltas, el proveedor JSON formatea."""
+    corridas_db = db.session.query(
+        Corridas.id, Corridas.ruta_id, Corridas.fecha_hora_salida, Corridas.precio, Corridas.capacidad_total
+    ).order_by(Corridas.fecha_hora_salida.desc()).all()
+    return [{
+        'id': id,
+        'ruta_nombre': serializacion.nombre_ruta(ruta_id),
+        'fecha_hora_salida': salida,
+        'precio': precio,
+        'capacidad': capacidad,
+    } for id, ruta_id, salida, precio, capacidad in corridas_db]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+    if serializacion.orjson is None:
+        print('orjson no está instalado: "orjson" y "stdlib" miden lo mismo')
+
+    app = crear_app_sqlite()
+    anterior = DefaultJSONProvider(app)  # sort_keys=True, como Flask por defecto
+    actual = ProveedorJSON(app)
+    with app.test_request_context():
+        sembrar(args.filas)
+        filas_anteriores, filas_actuales = lista_anterior(), lista_actual()
+        assert json.loads(anterior.dumps(filas_anteriores)) == json.loads(actual.dumps(filas_actuales))
+        print(f'{args.filas} filas, {len(actual.dumps(filas_actuales)) // 1024} KiB de JSON')
+
+        imprimir('dump: anterior (stdlib, sort_keys)',
+                 medir(lambda: anterior.response(filas_anteriores), args.repeticiones))
+        orjson = serializacion.orjson
+        imprimir('dump: ProveedorJSON (orjson)', medir(lambda: actual.response(filas_actuales), args.repeticiones))
+        serializacion.orjson = None
+        imprimir('dump: ProveedorJSON (stdlib)', medir(lambda: actual.response(filas_actuales), args.repeticiones))
+        serializacion.orjson = orjson
+
+        imprimir('consulta+dump: anterior',
+                 medir(lambda: anterior.response(lista_anterior()), args.repeticiones))
+        imprimir('consulta+dump: actual',
+                 medir(lambda: actual.response(lista_actual()), args.repeticiones))
+        token = create_access_token(identity='0')
+
+    client = app.test_client()
+    encabezados = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/admin/corridas', headers=encabezados).status_code == 200
+    imprimir('GET /api/admin/corridas (test_client)',
+             medir(lambda: client.get('/api/admin/corridas', headers=encabezados), args.repeticiones))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import os
+
+# Configuración de Gunicorn (Railway la carga automáticamente desde backend/).
+# Con --preload el master crea la app una vez y los workers la heredan por fork.
+
+preload_app = True
+
+# Varios hilos por worker (gthread): la cola de admisión por corrida (admision.py)
+# ordena a los requests concurrentes dentro de cada worker. app.py lee el mismo
+# GUNICORN_THREADS para limitar cuántos hilos pueden quedarse esperando turno.
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+
+def post_fork(server, worker):
+    # Los engines de SQLAlchemy se crearon en el master. Cada worker descarta el
+    # pool heredado (sin cerrar los sockets del padre) para abrir sus propias conexiones.
+    from app import app
+    from models import db
+    from registro import iniciar_escritor
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    # El hilo que escribe los logs no se hereda en el fork: cada worker arranca el suyo
+    iniciar_escritor()
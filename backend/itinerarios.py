@@ -0,0 +1,259 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, union
+
+from models import db, Rutas, Corridas, Reservas, AsientosReservados, AsientosBloqueados
+
+# --- Planificador de viajes con transbordo (A → B → C) ---
+# Grafo en memoria: para cada parada, las rutas que salen de ella; para cada ruta,
+# sus salidas futuras ordenadas. La búsqueda es por rondas (una ronda = un tramo más),
+# así que devuelve la llegada más temprana con 1, 2, ... tramos.
+
+
+class _Ruta:
+    __slots__ = ('id', 'origen', 'destino', 'duracion', 'salidas', 'corridas')
+
+    def __init__(self, id, origen, destino, duracion):
+        self.id = id
+        self.origen = origen
+        self.destino = destino
+        self.duracion = timedelta(minutes=duracion) if duracion else None
+        # Listas paralelas ordenadas por hora de salida (para bisect)
+        self.salidas = []
+        self.corridas = []  # (salida, corrida_id, capacidad, precio)
+
+
+class GrafoItinerarios:
+
+    def __init__(self):
+        self.rutas = {}
+        self.por_parada = {}
+        self.corrida_ruta = {}
+        self.construido_en = None
+        self.lock = threading.RLock()
+
+    # --- Construcción / actualización incremental ---
+
+    def cargar(self):
+        """Carga todas las rutas y las corridas futuras desde la BD."""
+        ahora = datetime.now(timezone.utc).replace(tzinfo=None)
+        rutas = db.session.query(Rutas.id, Rutas.origen, Rutas.destino, Rutas.duracion_estimada_min).all()
+        corridas = db.session.query(
+            Corridas.id, Corridas.ruta_id, Corridas.fecha_hora_salida, Corridas.capacidad_total, Corridas.precio
+        ).filter(Corridas.fecha_hora_salida > ahora)\
+            .order_by(Corridas.fecha_hora_salida.asc()).all()
+        with self.lock:
+            self.rutas = {}
+            self.por_parada = {}
+            self.corrida_ruta = {}
+            for ruta in rutas:
+                self.actualizar_ruta(*ruta)
+            for corrida_id, ruta_id, salida, capacidad, precio in corridas:
+                ruta = self.rutas.get(ruta_id)
+                if ruta is None:
+                    continue
+                # Vienen ordenadas: append en lugar de insort
+                ruta.salidas.append(salida)
+                ruta.corridas.append((salida, corrida_id, capacidad, precio))
+                self.corrida_ruta[corrida_id] = ruta_id
+            self.construido_en = time.monotonic()
+
+    def actualizar_ruta(self, ruta_id, origen, destino, duracion):
+        with self.lock:
+            anterior = self.rutas.get(ruta_id)
+            ruta = _Ruta(ruta_id, origen, destino, duracion)
+            if anterior is not None:
+                ruta.salidas, ruta.corridas = anterior.salidas, anterior.corridas
+                self.por_parada[anterior.origen].remove(ruta_id)
+            self.rutas[ruta_id] = ruta
+            self.por_parada.setdefault(origen, []).append(ruta_id)
+
+    def quitar_corrida(self, corrida_id):
+        with self.lock:
+            ruta_id = self.corrida_ruta.pop(corrida_id, None)
+            ruta = self.rutas.get(ruta_id)
+            if ruta is None:
+                return
+            for i, datos in enumerate(ruta.corridas):
+                if datos[1] == corrida_id:
+                    del ruta.corridas[i]
+                    del ruta.salidas[i]
+                    break
+
+    def poner_corrida(self, corrida_id, ruta_id, salida, capacidad, precio):
+        """Alta o cambio de una corrida (la quita de donde estaba y la vuelve a insertar)."""
+        if salida.tzinfo is not None:
+            salida = salida.astimezone(timezone.utc).replace(tzinfo=None)
+        with self.lock:
+            self.quitar_corrida(corrida_id)
+            ruta = self.rutas.get(ruta_id)
+            if ruta is None:
+                return
+            i = bisect_left(ruta.salidas, salida)
+            ruta.salidas.insert(i, salida)
+            ruta.corridas.insert(i, (salida, corrida_id, capacidad, precio))
+            self.corrida_ruta[corrida_id] = ruta_id
+
+    # --- Búsqueda ---
+
+    def buscar(self, origen, destino, desde, hasta, libres, pasajeros=1,
+               transbordo_min=timedelta(minutes=30), max_tramos=3):
+        """
+        Itinerarios de llegada más temprana de 'origen' a 'destino' saliendo en [desde, hasta].
+        'libres' es un dict corrida_id -> asientos disponibles.
+        Devuelve una lista de itinerarios (cada uno una lista de tramos), uno por número de
+        tramos, y sólo si llega antes que el de menos tramos.
+        """
+        mejor = {origen: desde}
+        marcadas = {origen: (desde, [])}
+        itinerarios = []
+        with self.lock:
+            for _ in range(max_tramos):
+                nuevas = {}
+                for parada, (llegada, tramos) in marcadas.items():
+                    listo = llegada + transbordo_min if tramos else llegada
+                    for ruta_id in self.por_parada.get(parada, ()):
+                        ruta = self.rutas[ruta_id]
+                        if ruta.duracion is None or any(t['origen'] == ruta.destino for t in tramos):
+                            continue
+                        i = bisect_left(ruta.salidas, listo)
+                        while i < len(ruta.salidas) and ruta.salidas[i] <= hasta:
+                            corrida_id = ruta.corridas[i][1]
+                            if libres.get(corrida_id, 0) >= pasajeros:
+                                break
+                            i += 1
+                        else:
+                            continue
+                        salida, corrida_id, _, precio = ruta.corridas[i]
+                        llegada_ruta = salida + ruta.duracion
+                        tope = min(mejor.get(ruta.destino, datetime.max), mejor.get(destino, datetime.max))
+                        if llegada_ruta >= tope:
+                            continue
+                        mejor[ruta.destino] = llegada_ruta
+                        nuevas[ruta.destino] = (llegada_ruta, tramos + [{
+                            'corrida_id': corrida_id,
+                            'ruta_id': ruta_id,
+                            'origen': ruta.origen,
+                            'destino': ruta.destino,
+                            'salida': salida,
+                            'llegada': llegada_ruta,
+                            'precio': precio,
+                        }])
+                if destino in nuevas:
+                    itinerarios.append(nuevas[destino][1])
+                marcadas = {p: v for p, v in nuevas.items() if p != destino}
+                if not marcadas:
+                    break
+        return itinerarios
+
+    def capacidades_en_ventana(self, desde, hasta):
+        """corrida_id -> capacidad de las corridas que salen en [desde, hasta]."""
+        with self.lock:
+            return {
+                c[1]: c[2]
+                for ruta in self.rutas.values()
+                for c in ruta.corridas[bisect_left(ruta.salidas, desde):bisect_right(ruta.salidas, hasta)]
+            }
+
+
+_grafo = GrafoItinerarios()
+_grafo_lock = threading.Lock()
+# Mientras se construye un grafo nuevo: cambios de este worker a reaplicarle antes de usarlo
+_cambios = None
+
+
+def _vencido(grafo, ttl_segundos):
+    return grafo.construido_en is None or time.monotonic() - grafo.construido_en > ttl_segundos
+
+
+def obtener_grafo(ttl_segundos):
+    """
+    Grafo del proceso. Cada worker lo mantiene al día con los cambios que hace él mismo;
+    los hechos por otros workers se ven cuando vence el TTL y se reconstruye. La
+    reconstrucción es de un solo hilo y en un grafo nuevo: mientras tanto se sirve el anterior.
+    """
+    global _grafo, _cambios
+    grafo = _grafo
+    if not _vencido(grafo, ttl_segundos):
+        return grafo
+    if grafo.construido_en is None:
+        # La primera vez no hay grafo que servir: se espera a que esté
+        with _grafo_lock:
+            if _grafo.construido_en is None:
+                _grafo.cargar()
+            return _grafo
+    with _grafo_lock:
+        if _cambios is not None or _grafo is not grafo:
+            # Otro hilo lo está reconstruyendo (o ya lo hizo)
+            return _grafo
+        _cambios = []
+    nuevo = GrafoItinerarios()
+    try:
+        nuevo.cargar()
+    except Exception:
+        with _grafo_lock:
+            _cambios = None
+        raise
+    with _grafo_lock:
+        # La carga pudo no ver lo que este worker cambió mientras tanto
+        for metodo, args in _cambios:
+            getattr(nuevo, metodo)(*args)
+        _cambios = None
+        _grafo = nuevo
+    return nuevo
+
+
+def asientos_libres(desde, hasta, capacidades):
+    """
+    Asientos disponibles (capacidad - reservados - bloqueados vigentes) de las corridas de
+    'capacidades' (corrida_id -> capacidad), que salen en [desde, hasta]. Se filtra por la
+    ventana con un join (no con una lista IN de miles de ids) y la BD devuelve sólo el
+    conteo por corrida.
+    """
+    if not capacidades:
+        return {}
+    en_ventana = (Corridas.fecha_hora_salida >= desde, Corridas.fecha_hora_salida <= hasta)
+    reservados = select(Reservas.corrida_id, AsientosReservados.numero_asiento)\
+        .join(AsientosReservados, AsientosReservados.reserva_id == Reservas.id)\
+        .join(Corridas, Corridas.id == Reservas.corrida_id)\
+        .where(*en_ventana)
+    bloqueados = select(AsientosBloqueados.corrida_id, AsientosBloqueados.numero_asiento)\
+        .join(Corridas, Corridas.id == AsientosBloqueados.corrida_id)\
+        .where(*en_ventana, AsientosBloqueados.expira_en > datetime.now(timezone.utc))
+    # UNION (no UNION ALL): un asiento bloqueado y ya reservado cuenta una vez
+    ocupados = union(reservados, bloqueados).subquery()
+    conteo = dict(db.session.query(ocupados.c.corrida_id, func.count()).group_by(ocupados.c.corrida_id).all())
+    return {cid: (capacidad or 0) - conteo.get(cid, 0) for cid, capacidad in capacidades.items()}
+
+
+def planear_viaje(origen, destino, desde, ventana, pasajeros, transbordo_min, max_tramos, ttl_segundos):
+    grafo = obtener_grafo(ttl_segundos)
+    hasta = desde + ventana
+    # La llegada puede caer después de 'hasta', pero las salidas no
+    capacidades = grafo.capacidades_en_ventana(desde, hasta)
+    libres = asientos_libres(desde, hasta, capacidades)
+    return grafo.buscar(origen, destino, desde, hasta, libres, pasajeros=pasajeros,
+                        transbordo_min=transbordo_min, max_tramos=max_tramos)
+
+
+def _notificar(metodo, *args):
+    with _grafo_lock:
+        getattr(_grafo, metodo)(*args)
+        if _cambios is not None:
+            _cambios.append((metodo, args))
+
+
+def notificar_ruta(ruta):
+    _notificar('actualizar_ruta', ruta.id, ruta.origen, ruta.destino, ruta.duracion_estimada_min)
+
+
+def notificar_corrida(corrida):
+    _notificar('poner_corrida', corrida.id, corrida.ruta_id, corrida.fecha_hora_salida,
+               corrida.capacidad_total, corrida.precio)
+
+
+def notificar_baja_corrida(corrida_id):
+    _notificar('quitar_corrida', corrida_id)
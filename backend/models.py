@@ -1,10 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import configure_mappers
 from datetime import datetime
+from replica import SesionEnrutada
 
 # --- (¡CAMBIO IMPORTANTE!) ---
 # Inicializamos la extensión 'db' aquí, VACÍA.
 # app.py importará esta variable 'db'
-db = SQLAlchemy()
+# La sesión enrutada manda los endpoints de solo lectura a la réplica (si existe)
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 
 # --- Tus modelos (Usan la 'db' definida arriba) ---
 
@@ -86,4 +89,24 @@ class AsientosBloqueados(db.Model):
     )
 
     def __repr__(self):
-        return f'<Bloqueo Asiento {self.numero_asiento} @ Corrida {self.corrida_id}>'
\ No newline at end of file
+        return f'<Bloqueo Asiento {self.numero_asiento} @ Corrida {self.corrida_id}>'
+
+class ResumenVentasDiario(db.Model):
+    # Rollup por (ruta, día local de salida). Se actualiza al reservar/pagar
+    # y se puede recalcular completo con 'flask recalcular-resumen'.
+    __tablename__ = 'resumen_ventas_diario'
+    ruta_id = db.Column(db.Integer, db.ForeignKey('rutas.id'), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    corridas = db.Column(db.Integer, nullable=False, default=0)
+    capacidad_ofrecida = db.Column(db.Integer, nullable=False, default=0)
+    asientos_vendidos = db.Column(db.Integer, nullable=False, default=0)
+    asientos_apartados = db.Column(db.Integer, nullable=False, default=0)
+    reservas_pendientes = db.Column(db.Integer, nullable=False, default=0)
+    ingresos = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<Resumen Ruta {self.ruta_id} @ {self.dia}>'
+
+# Los backrefs (Reservas.corrida, Corridas.ruta, ...) sólo existen como atributos de clase
+# una vez configurados los mappers; los configuramos aquí para poder usarlos en joinedload().
+configure_mappers()
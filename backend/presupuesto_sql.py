@@ -0,0 +1,71 @@
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from registro import log
+
+# --- Presupuesto de consultas SQL por endpoint ---
+# Cada endpoint declara cuántas sentencias SQL puede ejecutar por request con
+# @presupuesto_sql(n). Con SQL_PRESUPUESTO_ACTIVO se cuentan (eventos de SQLAlchemy)
+# y se devuelven en el header X-SQL-Consultas; si se pasa del presupuesto se registra
+# un warning, o se lanza PresupuestoSQLExcedido en modo estricto (por defecto en TESTING).
+# Sirve para detectar N+1: el conteo no debe crecer con el número de pasajeros/filas.
+
+
+class PresupuestoSQLExcedido(AssertionError):
+    pass
+
+
+_escuchando = False
+
+
+def _registrar_sentencia(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        consultas = g.get('sql_consultas')
+        if consultas is not None:
+            consultas.append(statement)
+
+
+def presupuesto_sql(maximo):
+    def decorador(f):
+        f.presupuesto_sql = maximo
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            if not config['SQL_PRESUPUESTO_ACTIVO']:
+                return f(*args, **kwargs)
+            g.sql_consultas = []
+            try:
+                resultado = f(*args, **kwargs)
+            finally:
+                consultas = g.pop('sql_consultas')
+                g.sql_total = len(consultas)
+            if len(consultas) > maximo:
+                mensaje = f'{f.__name__} ejecutó {len(consultas)} consultas SQL (presupuesto: {maximo})'
+                # Estricto por defecto en TESTING (se decide aquí: TESTING se suele poner después de create_app)
+                if config.get('SQL_PRESUPUESTO_ESTRICTO', current_app.testing):
+                    raise PresupuestoSQLExcedido(mensaje + ':\n' + '\n'.join(consultas))
+                log.warning(mensaje)
+            return resultado
+        return wrapper
+    return decorador
+
+
+def configurar_presupuesto_sql(app):
+    global _escuchando
+    app.config.setdefault('SQL_PRESUPUESTO_ACTIVO', False)
+    if not app.config['SQL_PRESUPUESTO_ACTIVO']:
+        return
+    if not _escuchando:
+        # A nivel de Engine: cubre la BD principal y la réplica
+        event.listen(Engine, 'before_cursor_execute', _registrar_sentencia)
+        _escuchando = True
+
+    @app.after_request
+    def _header_consultas(response):
+        if g.get('sql_total') is not None:
+            response.headers['X-SQL-Consultas'] = str(g.sql_total)
+        return response
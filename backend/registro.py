@@ -0,0 +1,185 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# --- Logging estructurado (JSON, una línea por registro) ---
+# Los handlers sólo encolan el registro; un hilo aparte lo escribe a stdout,
+# así un burst de errores (ej. Stripe caído) no frena los requests.
+
+log = logging.getLogger('pacifico')
+
+_handler_cola = None
+_suprimir = None
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+class _FormatoJSON(logging.Formatter):
+    CAMPOS_EXTRA = (
+        'request_id', 'endpoint', 'metodo', 'ruta', 'corrida_id', 'status',
+        'duracion_ms', 'repeticiones_suprimidas', 'traza',
+    )
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for campo in self.CAMPOS_EXTRA:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                datos[campo] = valor
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class _ContextoRequest(logging.Filter):
+    """Agrega request_id, endpoint, corrida_id y duración (corre en el hilo del request)."""
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = g.get('request_id')
+        if getattr(record, 'endpoint', None) is None:
+            record.endpoint = request.endpoint
+        if getattr(record, 'metodo', None) is None:
+            record.metodo = request.method
+        if getattr(record, 'ruta', None) is None:
+            record.ruta = request.path
+        if getattr(record, 'corrida_id', None) is None:
+            record.corrida_id = _corrida_id_del_request()
+        if getattr(record, 'duracion_ms', None) is None and g.get('inicio_request'):
+            record.duracion_ms = round((time.perf_counter() - g.inicio_request) * 1000, 1)
+        return True
+
+
+class _SuprimirDuplicados(logging.Filter):
+    """
+    La misma excepción (tipo + mensaje + endpoint) se escribe una vez por ventana;
+    las repeticiones se cuentan y se reportan con el siguiente registro que sí sale.
+    """
+
+    def __init__(self, ventana_segundos):
+        super().__init__()
+        self.ventana = ventana_segundos
+        self.vistos = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if not record.exc_info or not record.exc_info[1]:
+            return True
+        exc = record.exc_info[1]
+        clave = (type(exc).__name__, str(exc), getattr(record, 'endpoint', None))
+        ahora = time.monotonic()
+        with self.lock:
+            visto = self.vistos.get(clave)
+            if visto is not None and ahora - visto[0] < self.ventana:
+                visto[1] += 1
+                return False
+            if visto is not None and visto[1]:
+                record.repeticiones_suprimidas = visto[1]
+            self.vistos[clave] = [ahora, 0]
+            if len(self.vistos) > 1000:
+                self.vistos = {k: v for k, v in self.vistos.items() if ahora - v[0] < self.ventana}
+        return True
+
+
+class _HandlerCola(QueueHandler):
+
+    def prepare(self, record):
+        # Igual que QueueHandler.prepare pero sin mezclar la traza en el mensaje:
+        # la traza va en su propio campo para que el JSON quede en una línea.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.traza = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+def _corrida_id_del_request():
+    corrida_id = (request.view_args or {}).get('corrida_id') or request.args.get('corrida_id')
+    if corrida_id is None and request.is_json:
+        datos = request.get_json(silent=True)
+        if isinstance(datos, dict):
+            corrida_id = datos.get('corrida_id')
+    return corrida_id
+
+
+def iniciar_escritor():
+    """
+    Arranca el hilo escritor en este proceso. Los hilos no sobreviven al fork,
+    así que gunicorn lo vuelve a llamar en cada worker (post_fork).
+    """
+    global _listener, _listener_pid
+    with _listener_lock:
+        if _handler_cola is None or _listener_pid == os.getpid():
+            return
+        # Cola nueva: la del master pudo quedar con su lock tomado al hacer fork
+        _handler_cola.queue = queue.SimpleQueue()
+        salida = logging.StreamHandler(sys.stdout)
+        salida.setFormatter(_FormatoJSON())
+        _listener = QueueListener(_handler_cola.queue, salida)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def _detener_escritor():
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+def configurar_logging(app):
+    """Instala el handler con cola, el log de accesos muestreado y el X-Request-ID."""
+    global _handler_cola, _suprimir
+    app.config.setdefault('LOG_NIVEL', 'INFO')
+    app.config.setdefault('LOG_MUESTREO_EXITOS', 0.01)
+    app.config.setdefault('LOG_VENTANA_DUPLICADOS', 60)
+
+    if _handler_cola is None:
+        _handler_cola = _HandlerCola(queue.SimpleQueue())
+        _suprimir = _SuprimirDuplicados(app.config['LOG_VENTANA_DUPLICADOS'])
+        _handler_cola.addFilter(_ContextoRequest())
+        _handler_cola.addFilter(_suprimir)
+        log.addHandler(_handler_cola)
+        log.propagate = False
+        atexit.register(_detener_escritor)
+    log.setLevel(app.config['LOG_NIVEL'])
+    _suprimir.ventana = app.config['LOG_VENTANA_DUPLICADOS']
+    iniciar_escritor()
+
+    @app.before_request
+    def _inicio_request():
+        g.inicio_request = time.perf_counter()
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def _log_acceso(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        # Los errores siempre (4xx WARNING, 5xx ERROR); los éxitos sólo una muestra
+        # (LOG_MUESTREO_EXITOS, 0 a 1) en INFO
+        status = response.status_code
+        if status >= 500:
+            log.error('request', extra={'status': status})
+        elif status >= 400:
+            log.warning('request', extra={'status': status})
+        elif random.random() < app.config['LOG_MUESTREO_EXITOS']:
+            log.info('request', extra={'status': status})
+        return response
@@ -0,0 +1,122 @@
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from itsdangerous import BadData, URLSafeTimedSerializer
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+# --- Enrutamiento de lecturas a la réplica (DATABASE_REPLICA_URL) ---
+# Si no hay réplica configurada, todo sigue yendo a la BD principal.
+
+BIND_REPLICA = 'replica'
+# Token de read-your-writes: el backend lo manda después de una escritura y el
+# frontend lo reenvía en sus lecturas (va firmado y caduca solo, no hay estado en el servidor)
+HEADER_PIN = 'X-Leer-Primaria'
+
+# Cache del último lag medido: (instante de la medición, lag en segundos o None si falló)
+_lag_cache = (0.0, None)
+_lag_lock = threading.Lock()
+
+
+class SesionEnrutada(Session):
+    """
+    Sesión que manda las consultas a la réplica cuando el endpoint actual
+    fue marcado con @lectura_replica. Los flush (escrituras) van siempre a la primaria.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('usar_replica'):
+            engine = self._db.engines.get(BIND_REPLICA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def configurar_replica(app, replica_url):
+    """Registra la réplica como bind extra y el hook de read-your-writes."""
+    app.config.setdefault('REPLICA_MAX_LAG_SEGUNDOS', 5.0)
+    app.config.setdefault('REPLICA_PIN_SEGUNDOS', 10)
+    app.config.setdefault('REPLICA_LAG_CACHE_SEGUNDOS', 2.0)
+    if not replica_url:
+        return
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[BIND_REPLICA] = replica_url
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.after_request(_marcar_escritura)
+
+
+def _firmador():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='leer-primaria')
+
+
+def _marcar_escritura(response):
+    # Después de una escritura exitosa, el cliente lee de la primaria un rato
+    # para que vea sus propios cambios aunque la réplica vaya atrasada.
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+        return response
+    response.headers[HEADER_PIN] = _firmador().dumps(1)
+    return response
+
+
+def _cliente_fijado():
+    token = request.headers.get(HEADER_PIN)
+    if not token:
+        return False
+    try:
+        _firmador().loads(token, max_age=current_app.config['REPLICA_PIN_SEGUNDOS'])
+    except BadData:
+        return False
+    return True
+
+
+def _medir_lag(engine):
+    """Segundos de atraso de la réplica. En SQLite (pruebas locales) siempre es 0."""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    with engine.connect() as conn:
+        lag = conn.execute(text(
+            "SELECT CASE WHEN NOT pg_is_in_recovery() "
+            "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+            "END"
+        )).scalar()
+    # Si ya aplicó todo lo recibido, está al día aunque la primaria lleve rato sin escribir
+    return float(lag or 0.0)
+
+
+def lag_replica():
+    """Lag de la réplica con cache corto, para no medirlo en cada request."""
+    global _lag_cache
+    engine = current_app.extensions['sqlalchemy'].engines.get(BIND_REPLICA)
+    if engine is None:
+        return None
+    ahora = time.monotonic()
+    medido_en, lag = _lag_cache
+    if ahora - medido_en < current_app.config['REPLICA_LAG_CACHE_SEGUNDOS']:
+        return lag
+    with _lag_lock:
+        try:
+            lag = _medir_lag(engine)
+        except Exception:
+            lag = None
+        _lag_cache = (ahora, lag)
+    return lag
+
+
+def replica_disponible():
+    lag = lag_replica()
+    return lag is not None and lag <= current_app.config['REPLICA_MAX_LAG_SEGUNDOS']
+
+
+def lectura_replica(f):
+    """
+    Marca un endpoint de solo lectura para que lea de la réplica.
+    Cae a la primaria si el cliente acaba de escribir o si la réplica va atrasada.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        g.usar_replica = not _cliente_fijado() and replica_disponible()
+        return f(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,169 @@
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytz
+from sqlalchemy import func
+
+from models import db, Rutas, Corridas, Reservas, AsientosReservados, ResumenVentasDiario
+
+# --- Reportes de ventas y ocupación (rollups por ruta y día local) ---
+# Las salidas se guardan en UTC; el "día" del reporte es el día en México.
+
+TZ_MEXICO = pytz.timezone('America/Mexico_City')
+
+CAMPOS_SUMABLES = (
+    'corridas', 'capacidad_ofrecida', 'asientos_vendidos',
+    'asientos_apartados', 'reservas_pendientes', 'ingresos',
+)
+
+
+def dia_local(fecha_hora_salida):
+    if fecha_hora_salida.tzinfo is None:
+        fecha_hora_salida = fecha_hora_salida.replace(tzinfo=timezone.utc)
+    return fecha_hora_salida.astimezone(TZ_MEXICO).date()
+
+
+def inicio_dia_utc(dia):
+    """Medianoche local de 'dia' expresada en UTC (naive, como la columna)."""
+    local = TZ_MEXICO.localize(datetime.combine(dia, time.min))
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _sumar(ruta_id, dia, **deltas):
+    """Suma los deltas a la fila (ruta_id, dia), creándola si no existe (upsert)."""
+    dialecto = db.engine.dialect.name
+    if dialecto in ('postgresql', 'sqlite'):
+        if dialecto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        tabla = ResumenVentasDiario.__table__
+        stmt = insert(tabla).values(ruta_id=ruta_id, dia=dia, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['ruta_id', 'dia'],
+            set_={campo: tabla.c[campo] + stmt.excluded[campo] for campo in deltas}
+        )
+        db.session.execute(stmt)
+        return
+    fila = db.session.get(ResumenVentasDiario, (ruta_id, dia))
+    if fila is None:
+        fila = ResumenVentasDiario(ruta_id=ruta_id, dia=dia, **{c: 0 for c in CAMPOS_SUMABLES})
+        db.session.add(fila)
+    for campo, delta in deltas.items():
+        setattr(fila, campo, getattr(fila, campo) + delta)
+
+
+def registrar_reserva(corrida, num_asientos):
+    """Nueva reserva pendiente (se llama dentro de la transacción de /api/reservar)."""
+    _sumar(corrida.ruta_id, dia_local(corrida.fecha_hora_salida),
+           asientos_apartados=num_asientos, reservas_pendientes=1)
+
+
+def registrar_pago(corrida, num_asientos, monto):
+    """Una reserva pendiente pasó a pagada (webhook de Stripe)."""
+    _sumar(corrida.ruta_id, dia_local(corrida.fecha_hora_salida),
+           asientos_apartados=-num_asientos, reservas_pendientes=-1,
+           asientos_vendidos=num_asientos, ingresos=Decimal(str(monto or 0)))
+
+
+def recalcular_resumen(desde=None, hasta=None):
+    """
+    Reconstruye los rollups desde las tablas crudas para los días [desde, hasta].
+    Sin fechas recalcula todo. No hace commit.
+    """
+    filtros = []
+    borrar = ResumenVentasDiario.query
+    if desde is not None:
+        filtros.append(Corridas.fecha_hora_salida >= inicio_dia_utc(desde))
+        borrar = borrar.filter(ResumenVentasDiario.dia >= desde)
+    if hasta is not None:
+        filtros.append(Corridas.fecha_hora_salida < inicio_dia_utc(hasta + timedelta(days=1)))
+        borrar = borrar.filter(ResumenVentasDiario.dia <= hasta)
+
+    buckets = {}
+
+    def bucket(ruta_id, fecha_hora_salida):
+        clave = (ruta_id, dia_local(fecha_hora_salida))
+        if clave not in buckets:
+            buckets[clave] = {c: 0 for c in CAMPOS_SUMABLES}
+        return buckets[clave]
+
+    corridas = db.session.query(Corridas.ruta_id, Corridas.fecha_hora_salida, Corridas.capacidad_total)\
+        .filter(*filtros).all()
+    for ruta_id, salida, capacidad in corridas:
+        b = bucket(ruta_id, salida)
+        b['corridas'] += 1
+        b['capacidad_ofrecida'] += capacidad or 0
+
+    asientos_por_reserva = db.session.query(
+        AsientosReservados.reserva_id,
+        func.count(AsientosReservados.id).label('n')
+    ).group_by(AsientosReservados.reserva_id).subquery()
+
+    ventas = db.session.query(
+        Corridas.ruta_id,
+        Corridas.fecha_hora_salida,
+        Reservas.estado_pago,
+        func.count(Reservas.id),
+        func.coalesce(func.sum(asientos_por_reserva.c.n), 0),
+        func.coalesce(func.sum(Reservas.total_pagado), 0)
+    ).join(Reservas, Reservas.corrida_id == Corridas.id)\
+        .outerjoin(asientos_por_reserva, asientos_por_reserva.c.reserva_id == Reservas.id)\
+        .filter(*filtros)\
+        .group_by(Corridas.id, Corridas.ruta_id, Corridas.fecha_hora_salida, Reservas.estado_pago)\
+        .all()
+    for ruta_id, salida, estado, num_reservas, num_asientos, total in ventas:
+        b = bucket(ruta_id, salida)
+        if estado == 'pagado':
+            b['asientos_vendidos'] += num_asientos
+            b['ingresos'] += Decimal(str(total))
+        elif estado == 'pendiente':
+            b['asientos_apartados'] += num_asientos
+            b['reservas_pendientes'] += num_reservas
+
+    borrar.delete(synchronize_session=False)
+    db.session.add_all([
+        ResumenVentasDiario(ruta_id=ruta_id, dia=dia, **valores)
+        for (ruta_id, dia), valores in buckets.items()
+    ])
+    return len(buckets)
+
+
+def recalcular_dias(*fechas_hora_salida):
+    """Recalcula los días tocados por un alta/cambio/baja de corridas."""
+    for dia in {dia_local(f) for f in fechas_hora_salida if f is not None}:
+        recalcular_resumen(dia, dia)
+
+
+def consultar_resumen(desde, hasta, ruta_id=None, agrupar='dia'):
+    """Lee los rollups y los agrupa por día o semana (lunes) sin tocar las tablas crudas."""
+    query = db.session.query(ResumenVentasDiario, Rutas.origen, Rutas.destino)\
+        .join(Rutas, ResumenVentasDiario.ruta_id == Rutas.id)\
+        .filter(ResumenVentasDiario.dia >= desde, ResumenVentasDiario.dia <= hasta)
+    if ruta_id is not None:
+        query = query.filter(ResumenVentasDiario.ruta_id == ruta_id)
+    filas = query.order_by(ResumenVentasDiario.ruta_id, ResumenVentasDiario.dia).all()
+
+    resultado = {}
+    for fila, origen, destino in filas:
+        inicio = fila.dia
+        if agrupar == 'semana':
+            inicio = fila.dia - timedelta(days=fila.dia.weekday())
+        clave = (fila.ruta_id, inicio)
+        if clave not in resultado:
+            resultado[clave] = {
+                'ruta_id': fila.ruta_id,
+                'ruta_nombre': f"{origen} → {destino}",
+                'desde': inicio.isoformat(),
+                **{c: 0 for c in CAMPOS_SUMABLES}
+            }
+        for campo in CAMPOS_SUMABLES:
+            resultado[clave][campo] += getattr(fila, campo)
+
+    lista = []
+    for item in resultado.values():
+        capacidad = item['capacidad_ofrecida']
+        item['factor_ocupacion'] = round(item['asientos_vendidos'] / capacidad, 4) if capacidad else None
+        item['ingresos'] = str(item['ingresos'])
+        lista.append(item)
+    return lista
@@ -0,0 +1,82 @@
+import json
+import threading
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from models import db, Rutas
+
+# --- Serialización JSON rápida ---
+# Con orjson (si está instalado) las respuestas se serializan en C y los datetime/Decimal
+# se convierten sin pasar por isoformat()/str() en Python fila por fila.
+# Sin orjson se usa json de la stdlib con la misma salida.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fechas sin tzinfo como UTC y llaves no-str (ids) como en la stdlib
+_OPCIONES_ORJSON = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _a_json(obj):
+    if isinstance(obj, datetime):
+        # Las fechas de la BD son UTC sin tzinfo
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.astimezone(timezone.utc).isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f'Objeto de tipo {type(obj).__name__} no es serializable a JSON')
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """Proveedor JSON de la app: orjson si está disponible, si no la stdlib."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_a_json, option=_OPCIONES_ORJSON).decode('utf-8')
+        kwargs.setdefault('default', _a_json)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            cuerpo = orjson.dumps(obj, default=_a_json, option=_OPCIONES_ORJSON)
+        else:
+            cuerpo = json.dumps(obj, default=_a_json, ensure_ascii=self.ensure_ascii)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+
+# --- Nombres de ruta ("Origen → Destino") cacheados por id ---
+# Las rutas sólo se crean (no se editan ni se borran), así que el cache no se invalida;
+# un id desconocido recarga la tabla (es chica).
+
+_nombres_rutas = {}
+_nombres_lock = threading.Lock()
+
+
+def nombre_ruta(ruta_id):
+    nombre = _nombres_rutas.get(ruta_id)
+    if nombre is None:
+        with _nombres_lock:
+            for id, origen, destino in db.session.query(Rutas.id, Rutas.origen, Rutas.destino):
+                _nombres_rutas[id] = f"{origen} → {destino}"
+        nombre = _nombres_rutas.get(ruta_id)
+    return nombre
+
+
+def registrar_nombre_ruta(ruta):
+    _nombres_rutas[ruta.id] = f"{ruta.origen} → {ruta.destino}"
@@ -0,0 +1,52 @@
+import itertools
+import os
+
+import pytest
+
+# app.py construye la app global al importarse: que no apunte a Postgres
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+import admision
+import itinerarios
+import replica
+import serializacion
+from app import create_app
+from models import db
+
+
+def _limpiar_estado_del_proceso():
+    """Los caches por proceso (grafo, nombres de ruta, admisión, lag) no pasan de una app a otra."""
+    itinerarios._grafo = itinerarios.GrafoItinerarios()
+    itinerarios._cambios = None
+    serializacion._nombres_rutas.clear()
+    admision._estados.clear()
+    admision._esperando = 0
+    admision._barrido_en = 0.0
+    replica._lag_cache = (0.0, None)
+
+
+@pytest.fixture(autouse=True)
+def limpiar_estado_del_proceso():
+    _limpiar_estado_del_proceso()
+    yield
+
+
+@pytest.fixture
+def crear_app(tmp_path):
+    """Fábrica de apps de prueba, cada una con su archivo SQLite en tmp_path."""
+    creadas = itertools.count()
+
+    def _crear(**config):
+        base = {
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / f'primaria-{next(creadas)}.db'}",
+            'JWT_SECRET_KEY': 'clave-de-pruebas-suficientemente-larga',
+            'LOG_MUESTREO_EXITOS': 0,
+        }
+        _limpiar_estado_del_proceso()
+        app = create_app({**base, **config})
+        with app.app_context():
+            # Sólo la primaria: el bind 'replica' de otra app de prueba queda registrado en 'db'
+            db.create_all(bind_key=None)
+        return app
+    return _crear
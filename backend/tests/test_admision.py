@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import admision
+from models import db, Rutas, Corridas
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app()
+    with app.app_context():
+        db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+        db.session.add(Corridas(id=1, ruta_id=1, precio=450, capacidad_total=4,
+                                fecha_hora_salida=datetime.utcnow() + timedelta(days=2)))
+        db.session.commit()
+    return app
+
+
+def _bloquear(client, *asientos, corrida_id=1):
+    return client.post('/api/bloquear-asientos', json={'corrida_id': corrida_id, 'asientos': list(asientos)})
+
+
+def test_bloqueo_exitoso_actualiza_la_foto_sin_recargar(app, monkeypatch):
+    client = app.test_client()
+    assert _bloquear(client, 1).status_code == 200
+    assert 1 in admision._estados[1].bloqueados
+
+    recargas = []
+    monkeypatch.setattr(admision, '_cargar_ocupacion', lambda *a: recargas.append(a))
+    res = _bloquear(client, 1)
+    assert res.status_code == 409
+    assert int(res.headers['Retry-After']) > 0
+    assert recargas == []
+
+
+def test_corrida_inexistente_no_deja_estado(app):
+    client = app.test_client()
+    res = client.post('/api/reservar', json={
+        'corrida_id': 999, 'pasajeros': [{'asiento': 1, 'nombre': 'Ana', 'telefono': '555'}]
+    })
+    assert res.status_code == 404
+    assert admision._estados == {}
+
+
+def test_estados_inactivos_se_descartan(app):
+    with app.test_request_context():
+        viejo = admision._estado(7, 600)
+        viejo.usado_en -= 3600
+        admision._barrido_en = 0.0
+        admision._estado(8, 600)
+    assert set(admision._estados) == {8}
+
+
+def test_una_sola_recarga_a_la_vez(app, monkeypatch):
+    estado = admision._EstadoCorrida()
+    estado.cargando = True
+    recargas = []
+    monkeypatch.setattr(admision, '_cargar_ocupacion', lambda *a: recargas.append(a))
+    with app.test_request_context():
+        admision._asegurar_cargada(1, estado)
+    assert recargas == []
+
+
+def test_esperas_limitadas_por_proceso():
+    estado = admision._EstadoCorrida()
+    assert admision._entrar(estado, limite=1, esperas_max=1, espera=5)
+
+    admitido = threading.Event()
+    esperando = threading.Thread(
+        target=lambda: admision._entrar(estado, 1, 1, 5) and admitido.set())
+    esperando.start()
+    while not estado.cola:
+        time.sleep(0.001)
+
+    # Ya hay uno esperando en el proceso: el siguiente no bloquea su hilo, sale con 503
+    inicio = time.monotonic()
+    assert not admision._entrar(admision._EstadoCorrida(), 0, 1, 5)
+    assert time.monotonic() - inicio < 1
+
+    admision._salir(estado)
+    esperando.join(5)
+    assert admitido.is_set()
+    assert admision._esperando == 0
+
+
+def test_503_cuando_no_hay_lugar_para_esperar(app):
+    app.config['ADMISION_CONCURRENCIA_POR_CORRIDA'] = 0
+    app.config['ADMISION_ESPERAS_MAX'] = 0
+    res = _bloquear(app.test_client(), 2)
+    assert res.status_code == 503
+    assert res.headers['Retry-After'] == str(app.config['ADMISION_REINTENTO_SEGUNDOS'])
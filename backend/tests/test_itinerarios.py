@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import itinerarios
+from itinerarios import GrafoItinerarios, asientos_libres
+from models import db, Usuarios, Rutas, Corridas, Reservas, AsientosReservados, AsientosBloqueados
+
+SALIDA = datetime(2026, 5, 1, 8, 0)
+
+
+def _grafo():
+    grafo = GrafoItinerarios()
+    grafo.actualizar_ruta(1, 'Chilpancingo', 'Iguala', 90)
+    grafo.actualizar_ruta(2, 'Iguala', 'CDMX', 150)
+    grafo.poner_corrida(10, 1, SALIDA, 19, 300)
+    grafo.poner_corrida(20, 2, SALIDA + timedelta(hours=2), 19, 350)
+    return grafo
+
+
+def test_capacidades_incluyen_la_salida_en_el_limite():
+    grafo = _grafo()
+    # buscar() acepta salida <= hasta: la ventana también debe incluirla
+    assert grafo.capacidades_en_ventana(SALIDA, SALIDA) == {10: 19}
+    assert grafo.capacidades_en_ventana(SALIDA, SALIDA + timedelta(hours=2)) == {10: 19, 20: 19}
+
+
+def test_transbordo_que_sale_justo_al_cierre_de_la_ventana():
+    grafo = _grafo()
+    desde, hasta = SALIDA, SALIDA + timedelta(hours=2)
+    libres = grafo.capacidades_en_ventana(desde, hasta)
+    itinerarios = grafo.buscar('Chilpancingo', 'CDMX', desde, hasta, libres)
+    assert [[t['corrida_id'] for t in tramos] for tramos in itinerarios] == [[10, 20]]
+
+
+def test_sin_asientos_libres_no_hay_itinerario():
+    grafo = _grafo()
+    desde, hasta = SALIDA, SALIDA + timedelta(hours=2)
+    assert grafo.buscar('Chilpancingo', 'CDMX', desde, hasta, {10: 19, 20: 0}) == []
+
+
+def test_transbordo_minimo_rechaza_conexion_muy_justa():
+    grafo = GrafoItinerarios()
+    grafo.actualizar_ruta(1, 'Chilpancingo', 'Iguala', 90)
+    grafo.actualizar_ruta(2, 'Iguala', 'CDMX', 150)
+    grafo.poner_corrida(10, 1, SALIDA, 19, 300)
+    # Llega 09:30 y la conexión sale 09:45: 15 min de transbordo
+    grafo.poner_corrida(20, 2, SALIDA + timedelta(minutes=105), 19, 350)
+    desde, hasta = SALIDA, SALIDA + timedelta(hours=3)
+    libres = grafo.capacidades_en_ventana(desde, hasta)
+
+    assert grafo.buscar('Chilpancingo', 'CDMX', desde, hasta, libres, transbordo_min=timedelta(minutes=30)) == []
+    itinerarios = grafo.buscar('Chilpancingo', 'CDMX', desde, hasta, libres, transbordo_min=timedelta(minutes=15))
+    assert [[t['corrida_id'] for t in tramos] for tramos in itinerarios] == [[10, 20]]
+
+
+def test_mover_y_quitar_corridas():
+    grafo = _grafo()
+    grafo.poner_corrida(11, 1, SALIDA + timedelta(hours=1), 19, 300)
+    # Mover la 10 después de la 11: se reinserta en orden, sin duplicarse
+    grafo.poner_corrida(10, 1, SALIDA + timedelta(hours=2), 19, 300)
+    assert [c[1] for c in grafo.rutas[1].corridas] == [11, 10]
+    assert grafo.rutas[1].salidas == sorted(grafo.rutas[1].salidas)
+
+    # Cambiarla de ruta la saca de la anterior
+    grafo.poner_corrida(10, 2, SALIDA + timedelta(hours=5), 19, 350)
+    assert [c[1] for c in grafo.rutas[1].corridas] == [11]
+    assert [c[1] for c in grafo.rutas[2].corridas] == [20, 10]
+    assert grafo.corrida_ruta[10] == 2
+
+    grafo.quitar_corrida(10)
+    grafo.quitar_corrida(999)  # desconocida: no pasa nada
+    assert [c[1] for c in grafo.rutas[2].corridas] == [20]
+    assert 10 not in grafo.corrida_ruta
+    assert grafo.capacidades_en_ventana(SALIDA, SALIDA + timedelta(days=1)) == {11: 19, 20: 19}
+
+
+def test_reconstruccion_sirve_el_grafo_anterior_y_reaplica_cambios(monkeypatch):
+    anterior = _grafo()
+    anterior.construido_en = time.monotonic() - 3600
+    monkeypatch.setattr(itinerarios, '_grafo', anterior)
+
+    cargando, seguir = threading.Event(), threading.Event()
+
+    def cargar_lento(self):
+        cargando.set()
+        seguir.wait(5)
+        # Lo que "leyó de la BD" todavía incluye la corrida 20
+        for ruta_id, ruta in anterior.rutas.items():
+            self.actualizar_ruta(ruta_id, ruta.origen, ruta.destino, 90)
+        self.poner_corrida(10, 1, SALIDA, 19, 300)
+        self.poner_corrida(20, 2, SALIDA + timedelta(hours=2), 19, 350)
+        self.construido_en = time.monotonic()
+
+    monkeypatch.setattr(GrafoItinerarios, 'cargar', cargar_lento)
+    resultado = {}
+    hilo = threading.Thread(target=lambda: resultado.setdefault('grafo', itinerarios.obtener_grafo(60)))
+    hilo.start()
+    assert cargando.wait(5)
+
+    # Mientras se reconstruye, los demás requests no esperan: usan el grafo anterior
+    inicio = time.monotonic()
+    assert itinerarios.obtener_grafo(60) is anterior
+    assert time.monotonic() - inicio < 1
+    itinerarios.notificar_baja_corrida(20)
+
+    seguir.set()
+    hilo.join(5)
+    nuevo = resultado['grafo']
+    assert nuevo is not anterior and itinerarios._grafo is nuevo
+    assert 20 not in nuevo.corrida_ruta
+    assert itinerarios._cambios is None
+
+
+def test_asientos_libres_por_ventana(crear_app):
+    app = crear_app()
+    with app.app_context():
+        db.session.add(Usuarios(id=1, nombre_completo='Ana', telefono='555'))
+        db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+        for corrida_id, salida in ((1, SALIDA), (2, SALIDA + timedelta(hours=1)), (3, SALIDA + timedelta(days=2))):
+            db.session.add(Corridas(id=corrida_id, ruta_id=1, precio=450, capacidad_total=19, fecha_hora_salida=salida))
+        db.session.add(Reservas(id=1, codigo_reserva='PT-1', corrida_id=1, usuario_id=1))
+        db.session.add_all([
+            AsientosReservados(reserva_id=1, numero_asiento=1, nombre_pasajero='Ana'),
+            AsientosReservados(reserva_id=1, numero_asiento=2, nombre_pasajero='Luis'),
+        ])
+        futuro = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=5)
+        db.session.add_all([
+            # Bloqueado y ya reservado: cuenta una vez
+            AsientosBloqueados(corrida_id=1, numero_asiento=2, expira_en=futuro),
+            AsientosBloqueados(corrida_id=2, numero_asiento=5, expira_en=futuro),
+            AsientosBloqueados(corrida_id=2, numero_asiento=6, expira_en=futuro - timedelta(hours=1)),
+            AsientosBloqueados(corrida_id=3, numero_asiento=1, expira_en=futuro),
+        ])
+        db.session.commit()
+
+        libres = asientos_libres(SALIDA, SALIDA + timedelta(hours=6), {1: 19, 2: 19})
+        assert libres == {1: 17, 2: 18}
+
+
+def test_itinerarios_parametros_invalidos(crear_app):
+    client = crear_app().test_client()
+    for query in ('destino=CDMX', 'origen=Chilpancingo', 'origen=A&destino=B&pasajeros=0',
+                  'origen=A&destino=B&transbordo_min=-5', 'origen=A&destino=B&fecha=08-11-2025'):
+        res = client.get(f'/api/itinerarios?{query}')
+        assert res.status_code == 400, query
+        assert 'error' in res.get_json()
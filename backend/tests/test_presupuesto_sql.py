@@ -0,0 +1,144 @@
+"""
+Presupuesto de consultas SQL por endpoint (@presupuesto_sql).
+
+Cada endpoint se llama con datos de tamaño N=1 y N=100 (pasajeros por reserva, asientos
+pedidos, rutas, corridas del día, filas del manifiesto...). El conteo de X-SQL-Consultas
+debe caber en el presupuesto (en TESTING pasarse lanza PresupuestoSQLExcedido) y no debe
+crecer con N: si crece, hay un N+1.
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+import stripe
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+from app import bcrypt
+from models import db, Usuarios, Rutas, Corridas, Reservas, AsientosReservados, AsientosBloqueados
+from reportes import inicio_dia_utc, recalcular_resumen
+
+DIA = date.today() + timedelta(days=3)
+PASSWORD = 'secreta'
+PASSWORD_HASH = bcrypt.generate_password_hash(PASSWORD, rounds=4).decode('utf-8')
+
+
+def _sembrar(n):
+    """
+    Corrida 1 (ruta 1, el DIA) con una reserva pagada y una pendiente de n pasajeros cada
+    una y n asientos bloqueados; n corridas ese día en la ruta 1, n rutas encadenadas
+    (Parada 1 → Parada 2 → ...) y las corridas 2 y 3 libres para borrar/editar.
+    """
+    salida = inicio_dia_utc(DIA) + timedelta(hours=10)
+    capacidad = 5 * n + 10
+    db.session.add(Usuarios(id=1, nombre_completo='Admin', telefono='admin', rol='admin', password_hash=PASSWORD_HASH))
+    db.session.execute(Rutas.__table__.insert(), [
+        {'id': i, 'origen': f'Parada {i}', 'destino': f'Parada {i + 1}', 'duracion_estimada_min': 30}
+        for i in range(1, n + 2)
+    ])
+    db.session.execute(Corridas.__table__.insert(), [
+        {'id': i, 'ruta_id': 1 if i <= n + 3 else i - n - 2, 'fecha_hora_salida': salida + timedelta(minutes=i),
+         'precio': 450, 'capacidad_total': capacidad}
+        for i in range(1, 2 * n + 4)
+    ])
+    for id, codigo, estado in ((1, 'PT-PAGADA', 'pagado'), (2, 'PT-PENDIENTE', 'pendiente')):
+        db.session.add(Reservas(id=id, codigo_reserva=codigo, corrida_id=1, usuario_id=1, estado_pago=estado,
+                                total_pagado=450 * n, stripe_session_id=f'cs_{codigo}'))
+    db.session.execute(AsientosReservados.__table__.insert(), [
+        {'reserva_id': reserva_id, 'numero_asiento': (reserva_id - 1) * n + i, 'nombre_pasajero': f'Pasajero {i}',
+         'telefono_pasajero': f'55{i}'}
+        for reserva_id in (1, 2) for i in range(1, n + 1)
+    ])
+    db.session.execute(AsientosBloqueados.__table__.insert(), [
+        {'corrida_id': 1, 'numero_asiento': 2 * n + i, 'expira_en': salida}
+        for i in range(1, n + 1)
+    ])
+    recalcular_resumen()
+    db.session.commit()
+
+
+def _llamadas(n):
+    """endpoint -> (método, url, json, status esperado)."""
+    libres = range(3 * n + 1, 4 * n + 1)
+    return {
+        'hello_world': ('GET', '/api/test', None, 200),
+        'get_corridas': ('GET', f'/api/corridas?ruta_id=1&fecha={DIA}', None, 200),
+        'get_itinerarios': ('GET', f'/api/itinerarios?origen=Parada 1&destino=Parada 4&fecha={DIA}', None, 200),
+        'get_asientos': ('GET', '/api/asientos?corrida_id=1', None, 200),
+        'bloquear_asientos': ('POST', '/api/bloquear-asientos', {'corrida_id': 1, 'asientos': list(libres)}, 200),
+        'crear_reserva': ('POST', '/api/reservar', {'corrida_id': 1, 'pasajeros': [
+            {'asiento': a, 'nombre': f'Pasajero {a}', 'telefono': '5550001'} for a in libres
+        ]}, 201),
+        'get_ticket_pdf': ('GET', '/api/ticket/pdf/PT-PAGADA', None, 200),
+        'stripe_webhook': ('POST', '/api/pagos/webhook', {}, 200),
+        'get_estado_reserva': ('GET', '/api/estado-reserva-por-session?session_id=cs_PT-PAGADA', None, 200),
+        'validar_ticket': ('POST', '/api/validar-ticket', {'codigo_reserva': 'PT-PAGADA'}, 200),
+        'admin_register': ('POST', '/api/admin/register', {'telefono': 'nuevo', 'password': 'x', 'nombre': 'Nuevo'}, 201),
+        'admin_login': ('POST', '/api/admin/login', {'telefono': 'admin', 'password': PASSWORD}, 200),
+        'get_rutas': ('GET', '/api/admin/rutas', None, 200),
+        'crear_ruta': ('POST', '/api/admin/rutas', {'origen': 'Acapulco', 'destino': 'Taxco', 'duracion': 240}, 201),
+        'get_todas_corridas': ('GET', '/api/admin/corridas', None, 200),
+        'crear_corrida': ('POST', '/api/admin/corridas', {
+            'ruta_id': 1, 'fecha_hora': f'{DIA}T18:00:00', 'precio': 450, 'capacidad': 19
+        }, 201),
+        'cancelar_corrida': ('DELETE', '/api/admin/corridas/2', None, 200),
+        'actualizar_corrida': ('PUT', '/api/admin/corridas/3', {
+            'ruta_id': 2, 'fecha_hora': f'{DIA}T19:00:00', 'precio': 500, 'capacidad': 19
+        }, 200),
+        'get_manifiesto': ('GET', '/api/admin/manifiesto/1', None, 200),
+        'get_reporte_ventas': ('GET', f'/api/admin/reportes/ventas?desde={DIA}&hasta={DIA}&agrupar=semana', None, 200),
+    }
+
+
+@pytest.fixture(autouse=True)
+def stripe_falso(monkeypatch):
+    monkeypatch.setattr(stripe.checkout.Session, 'create',
+                        lambda **kwargs: SimpleNamespace(id=f"cs_{kwargs['client_reference_id']}", url='https://pago'))
+    monkeypatch.setattr(stripe.Webhook, 'construct_event', lambda payload, firma, secreto: {
+        'type': 'checkout.session.completed',
+        'data': {'object': {'client_reference_id': 'PT-PENDIENTE', 'amount_total': 45000}},
+    })
+
+
+@pytest.fixture
+def contar(crear_app):
+    def _contar(endpoint, n):
+        app = crear_app(SQL_PRESUPUESTO_ACTIVO=True)
+        with app.app_context():
+            _sembrar(n)
+            token = create_access_token(identity='admin')
+        metodo, url, datos, esperado = _llamadas(n)[endpoint]
+        res = app.test_client().open(url, method=metodo, json=datos, headers={'Authorization': f'Bearer {token}'})
+        assert res.status_code == esperado, res.get_data(as_text=True)
+        return int(res.headers['X-SQL-Consultas']), app.view_functions[endpoint].presupuesto_sql
+    return _contar
+
+
+def test_todos_los_endpoints_con_presupuesto_estan_cubiertos(crear_app):
+    app = crear_app()
+    con_presupuesto = {nombre for nombre, f in app.view_functions.items() if hasattr(f, 'presupuesto_sql')}
+    assert con_presupuesto == set(_llamadas(1))
+
+
+@pytest.mark.parametrize('endpoint', sorted(_llamadas(1)))
+def test_consultas_no_crecen_con_n(contar, endpoint):
+    consultas_1, presupuesto = contar(endpoint, 1)
+    consultas_100, _ = contar(endpoint, 100)
+    assert consultas_100 <= presupuesto
+    assert consultas_100 == consultas_1
+
+
+def test_presupuesto_excedido_es_error_en_testing(crear_app):
+    from presupuesto_sql import PresupuestoSQLExcedido, presupuesto_sql
+
+    app = crear_app(SQL_PRESUPUESTO_ACTIVO=True)
+
+    @app.route('/api/dos-consultas')
+    @presupuesto_sql(1)
+    def dos_consultas():
+        db.session.execute(text('SELECT 1'))
+        db.session.execute(text('SELECT 2'))
+        return {}
+
+    with pytest.raises(PresupuestoSQLExcedido):
+        app.test_client().get('/api/dos-consultas')
@@ -0,0 +1,123 @@
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from flask import jsonify
+
+import registro
+
+
+def _registro_con_excepcion(mensaje='Stripe caído'):
+    try:
+        raise RuntimeError(mensaje)
+    except RuntimeError:
+        record = logging.LogRecord('pacifico', logging.ERROR, __file__, 1, 'error', None, sys.exc_info())
+    record.endpoint = 'crear_reserva'
+    return record
+
+
+@pytest.fixture
+def lineas(monkeypatch):
+    """
+    Desvía la cola del handler: en vez de que el hilo escritor la vacíe a stdout,
+    la prueba lee los registros encolados y los formatea como lo haría él.
+    """
+    cola = queue.SimpleQueue()
+    monkeypatch.setattr(registro._handler_cola, 'queue', cola)
+    monkeypatch.setattr(registro._suprimir, 'vistos', {})
+
+    def _lineas():
+        formato = registro._FormatoJSON()
+        salida = []
+        while not cola.empty():
+            linea = formato.format(cola.get())
+            assert '\n' not in linea
+            salida.append(json.loads(linea))
+        return salida
+    return _lineas
+
+
+def _app_con_rutas(crear_app, **config):
+    app = crear_app(**config)
+
+    @app.route('/api/prueba/<int:corrida_id>/<int:status>')
+    def prueba(corrida_id, status):
+        return jsonify({}), status
+
+    @app.route('/api/prueba-error')
+    def prueba_error():
+        try:
+            raise RuntimeError('Stripe caído')
+        except RuntimeError:
+            registro.log.exception('Error en /api/prueba-error')
+        return jsonify({}), 500
+
+    return app
+
+
+def test_una_linea_json_por_registro_con_contexto(crear_app, lineas):
+    app = _app_con_rutas(crear_app)
+    res = app.test_client().get('/api/prueba/7/404', headers={'X-Request-ID': 'abc123'})
+    assert res.headers['X-Request-ID'] == 'abc123'
+    [linea] = lineas()
+    assert linea['nivel'] == 'WARNING'
+    assert linea['mensaje'] == 'request'
+    assert linea['status'] == 404
+    assert linea['request_id'] == 'abc123'
+    assert linea['endpoint'] == 'prueba'
+    assert linea['corrida_id'] == 7
+    assert linea['duracion_ms'] >= 0
+
+
+def test_request_id_generado_si_no_llega(crear_app, lineas):
+    app = _app_con_rutas(crear_app)
+    res = app.test_client().get('/api/prueba/7/404')
+    assert res.headers['X-Request-ID']
+    assert lineas()[0]['request_id'] == res.headers['X-Request-ID']
+
+
+def test_traza_en_su_propio_campo(crear_app, lineas):
+    app = _app_con_rutas(crear_app)
+    app.test_client().get('/api/prueba-error')
+    error, acceso = lineas()
+    assert error['nivel'] == 'ERROR'
+    assert error['mensaje'] == 'Error en /api/prueba-error'
+    assert 'Traceback' in error['traza'] and 'RuntimeError: Stripe caído' in error['traza']
+    assert acceso['nivel'] == 'ERROR' and acceso['status'] == 500
+    assert 'traza' not in acceso
+
+
+def test_muestreo_cero_descarta_exitos_y_conserva_errores(crear_app, lineas):
+    app = _app_con_rutas(crear_app, LOG_MUESTREO_EXITOS=0)
+    client = app.test_client()
+    for status in (200, 201, 409, 503):
+        client.get(f'/api/prueba/1/{status}')
+    assert [(l['status'], l['nivel']) for l in lineas()] == [(409, 'WARNING'), (503, 'ERROR')]
+
+
+def test_muestreo_uno_registra_exitos_en_info(crear_app, lineas):
+    app = _app_con_rutas(crear_app, LOG_MUESTREO_EXITOS=1)
+    app.test_client().get('/api/prueba/1/200')
+    assert [(l['status'], l['nivel']) for l in lineas()] == [(200, 'INFO')]
+
+
+def test_ventana_de_duplicados_se_lee_del_entorno(crear_app, monkeypatch):
+    monkeypatch.setenv('LOG_VENTANA_DUPLICADOS', '5')
+    app = crear_app()
+    assert app.config['LOG_VENTANA_DUPLICADOS'] == 5
+    assert registro._suprimir.ventana == 5
+
+
+def test_duplicados_se_suprimen_dentro_de_la_ventana():
+    filtro = registro._SuprimirDuplicados(60)
+    assert filtro.filter(_registro_con_excepcion())
+    assert not filtro.filter(_registro_con_excepcion())
+    assert filtro.filter(_registro_con_excepcion('otro error'))
+
+
+def test_ventana_cero_no_suprime():
+    filtro = registro._SuprimirDuplicados(0)
+    assert filtro.filter(_registro_con_excepcion())
+    assert filtro.filter(_registro_con_excepcion())
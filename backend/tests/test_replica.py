@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import replica
+from models import db, Usuarios, Rutas, Corridas, Reservas
+
+
+def _sembrar(session_id=None):
+    """Usuario, ruta y corrida (y opcionalmente una reserva) en la BD de la sesión actual."""
+    db.session.add(Usuarios(id=1, nombre_completo='Ana', telefono='555'))
+    db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+    db.session.add(Corridas(id=1, ruta_id=1, precio=450, capacidad_total=19,
+                            fecha_hora_salida=datetime.utcnow() + timedelta(days=2)))
+    if session_id:
+        db.session.add(Reservas(id=1, codigo_reserva='PT-1', corrida_id=1, usuario_id=1,
+                                stripe_session_id=session_id))
+    db.session.commit()
+
+
+@pytest.fixture
+def app(crear_app, tmp_path):
+    app = crear_app(DATABASE_REPLICA_URL=f"sqlite:///{tmp_path / 'replica.db'}")
+    with app.app_context():
+        motor_replica = db.engines[replica.BIND_REPLICA]
+        db.metadata.create_all(motor_replica)
+        _sembrar()
+        # La reserva sólo existe en la réplica: si la lectura la encuentra, fue a la réplica
+        with db.engines[replica.BIND_REPLICA].begin() as conn:
+            for tabla in ('usuarios', 'rutas', 'corridas'):
+                filas = db.session.execute(db.metadata.tables[tabla].select()).mappings().all()
+                conn.execute(db.metadata.tables[tabla].insert(), [dict(f) for f in filas])
+            conn.execute(Reservas.__table__.insert(), [{
+                'id': 1, 'codigo_reserva': 'PT-1', 'corrida_id': 1, 'usuario_id': 1,
+                'estado_pago': 'pendiente', 'stripe_session_id': 'sesion-replica',
+                'fecha_creacion': datetime.utcnow(),
+            }])
+    return app
+
+
+def _estado(client, **headers):
+    return client.get('/api/estado-reserva-por-session?session_id=sesion-replica', headers=headers)
+
+
+def test_lectura_marcada_va_a_la_replica(app):
+    client = app.test_client()
+    assert _estado(client).status_code == 200
+
+
+def test_despues_de_escribir_lee_de_la_primaria(app):
+    client = app.test_client()
+    res = client.post('/api/bloquear-asientos', json={'corrida_id': 1, 'asientos': [3]})
+    assert res.status_code == 200
+    token = res.headers[replica.HEADER_PIN]
+
+    assert _estado(client, **{replica.HEADER_PIN: token}).status_code == 404
+    # Sin el token (otro cliente) sigue leyendo de la réplica
+    assert _estado(client).status_code == 200
+
+
+def test_token_falso_no_fija_la_primaria(app):
+    client = app.test_client()
+    assert _estado(client, **{replica.HEADER_PIN: 'inventado'}).status_code == 200
+
+
+def test_token_caducado_vuelve_a_la_replica(app):
+    app.config['REPLICA_PIN_SEGUNDOS'] = -1
+    client = app.test_client()
+    token = client.post('/api/bloquear-asientos', json={'corrida_id': 1, 'asientos': [4]}).headers[replica.HEADER_PIN]
+    assert _estado(client, **{replica.HEADER_PIN: token}).status_code == 200
+
+
+def test_replica_atrasada_cae_a_la_primaria(app, monkeypatch):
+    monkeypatch.setattr(replica, '_medir_lag', lambda engine: app.config['REPLICA_MAX_LAG_SEGUNDOS'] + 1)
+    client = app.test_client()
+    assert _estado(client).status_code == 404
+
+
+def test_error_midiendo_lag_cae_a_la_primaria(app, monkeypatch):
+    def falla(engine):
+        raise RuntimeError('réplica caída')
+    monkeypatch.setattr(replica, '_medir_lag', falla)
+    client = app.test_client()
+    assert _estado(client).status_code == 404
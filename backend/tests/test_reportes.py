@@ -0,0 +1,119 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from models import db, Usuarios, Rutas, Corridas, Reservas, AsientosReservados, ResumenVentasDiario
+from reportes import CAMPOS_SUMABLES, consultar_resumen, recalcular_resumen, registrar_pago, registrar_reserva
+
+DIA = date(2026, 5, 6)  # miércoles
+SALIDA = datetime(2026, 5, 6, 15, 0)  # UTC: 09:00 en México, el mismo día
+
+
+def _filas():
+    return {
+        (f.ruta_id, f.dia): tuple(getattr(f, c) for c in CAMPOS_SUMABLES)
+        for f in db.session.query(ResumenVentasDiario).all()
+    }
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app()
+    with app.app_context():
+        db.session.add(Usuarios(id=1, nombre_completo='Admin', telefono='admin', rol='admin'))
+        db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+        db.session.add(Corridas(id=1, ruta_id=1, precio=450, capacidad_total=19, fecha_hora_salida=SALIDA))
+        db.session.add(Reservas(id=1, codigo_reserva='PT-1', corrida_id=1, usuario_id=1,
+                                estado_pago='pagado', total_pagado=900))
+        db.session.add(Reservas(id=2, codigo_reserva='PT-2', corrida_id=1, usuario_id=1,
+                                estado_pago='pendiente', total_pagado=450))
+        db.session.add_all([
+            AsientosReservados(reserva_id=1, numero_asiento=1, nombre_pasajero='Ana'),
+            AsientosReservados(reserva_id=1, numero_asiento=2, nombre_pasajero='Luis'),
+            AsientosReservados(reserva_id=2, numero_asiento=3, nombre_pasajero='Eva'),
+        ])
+        recalcular_resumen()
+        db.session.commit()
+    return app
+
+
+def test_recalcular_resumen_desde_las_tablas_crudas(app):
+    with app.app_context():
+        # corridas, capacidad, vendidos, apartados, pendientes, ingresos
+        assert _filas() == {(1, DIA): (1, 19, 2, 1, 1, Decimal('900.00'))}
+
+
+def test_reserva_y_pago_mueven_asientos_de_apartados_a_vendidos(app):
+    with app.app_context():
+        corrida = db.session.get(Corridas, 1)
+        registrar_reserva(corrida, 3)
+        db.session.commit()
+        assert _filas()[(1, DIA)] == (1, 19, 2, 4, 2, Decimal('900.00'))
+
+        registrar_pago(corrida, 3, 1350)
+        db.session.commit()
+        assert _filas()[(1, DIA)] == (1, 19, 5, 1, 1, Decimal('2250.00'))
+
+
+def test_recalcular_dias_en_alta_cambio_y_baja_de_corridas(app):
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='admin')}"}
+    client = app.test_client()
+
+    def cuadra_con_recalculo_completo():
+        with app.app_context():
+            incremental = _filas()
+            recalcular_resumen()
+            completo = _filas()
+            db.session.rollback()
+        assert incremental == completo
+        return incremental
+
+    res = client.post('/api/admin/corridas', headers=headers, json={
+        'ruta_id': 1, 'fecha_hora': '2026-05-07T15:00:00', 'precio': 450, 'capacidad': 30})
+    assert res.status_code == 201
+    corrida_id = res.get_json()['id']
+    assert cuadra_con_recalculo_completo()[(1, date(2026, 5, 7))][:2] == (1, 30)
+
+    res = client.put(f'/api/admin/corridas/{corrida_id}', headers=headers, json={
+        'ruta_id': 1, 'fecha_hora': '2026-05-06T20:00:00', 'precio': 450, 'capacidad': 30})
+    assert res.status_code == 200
+    filas = cuadra_con_recalculo_completo()
+    assert (1, date(2026, 5, 7)) not in filas
+    assert filas[(1, DIA)][:2] == (2, 49)
+
+    assert client.delete(f'/api/admin/corridas/{corrida_id}', headers=headers).status_code == 200
+    assert cuadra_con_recalculo_completo()[(1, DIA)][:2] == (1, 19)
+
+
+def test_consultar_resumen_por_semana(app):
+    with app.app_context():
+        db.session.query(ResumenVentasDiario).delete()
+        db.session.add(Rutas(id=2, origen='Iguala', destino='Taxco', duracion_estimada_min=60))
+        for ruta_id, dia, capacidad, vendidos, ingresos in (
+            (1, date(2026, 5, 4), 19, 10, 4500),   # lunes
+            (1, date(2026, 5, 10), 19, 9, 4050),   # domingo: misma semana
+            (1, date(2026, 5, 11), 19, 19, 8550),  # lunes siguiente
+            (2, date(2026, 5, 6), 0, 0, 0),
+        ):
+            db.session.add(ResumenVentasDiario(
+                ruta_id=ruta_id, dia=dia, corridas=1, capacidad_ofrecida=capacidad, asientos_vendidos=vendidos,
+                asientos_apartados=0, reservas_pendientes=0, ingresos=ingresos))
+        db.session.commit()
+
+        semanas = consultar_resumen(date(2026, 5, 1), date(2026, 5, 31), agrupar='semana')
+        resumen = {(s['ruta_id'], s['desde']): s for s in semanas}
+        assert set(resumen) == {(1, '2026-05-04'), (1, '2026-05-11'), (2, '2026-05-04')}
+
+        primera = resumen[(1, '2026-05-04')]
+        assert (primera['corridas'], primera['capacidad_ofrecida'], primera['asientos_vendidos']) == (2, 38, 19)
+        assert primera['factor_ocupacion'] == 0.5
+        assert primera['ingresos'] == '8550.00'
+        assert primera['ruta_nombre'] == 'Chilpancingo → CDMX'
+        assert resumen[(1, '2026-05-11')]['factor_ocupacion'] == 1.0
+        assert resumen[(2, '2026-05-04')]['factor_ocupacion'] is None
+
+        por_dia = consultar_resumen(date(2026, 5, 1), date(2026, 5, 31), ruta_id=1)
+        assert [d['desde'] for d in por_dia] == ['2026-05-04', '2026-05-10', '2026-05-11']
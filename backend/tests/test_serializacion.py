@@ -0,0 +1,75 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import jsonify
+
+import serializacion
+from models import db, Rutas
+from serializacion import nombre_ruta
+
+DATOS = {
+    'salida': datetime(2026, 5, 6, 15, 0),
+    'salida_con_tz': datetime(2026, 5, 6, 9, 0, tzinfo=timezone.utc),
+    'dia': date(2026, 5, 6),
+    'precio': Decimal('450.50'),
+    'ocupacion': {1: 17, 2: 18},
+}
+
+ESPERADO = {
+    'salida': '2026-05-06T15:00:00+00:00',
+    'salida_con_tz': '2026-05-06T09:00:00+00:00',
+    'dia': '2026-05-06',
+    'precio': '450.50',
+    'ocupacion': {'1': 17, '2': 18},
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, crear_app, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(serializacion, 'orjson', None)
+    elif serializacion.orjson is None:
+        pytest.skip('orjson no está instalado')
+    return crear_app()
+
+
+def test_dumps(app):
+    assert json.loads(app.json.dumps(DATOS)) == ESPERADO
+
+
+def test_respuesta(app):
+    with app.app_context():
+        respuesta = jsonify(DATOS)
+    assert respuesta.mimetype == 'application/json'
+    assert json.loads(respuesta.get_data()) == ESPERADO
+
+
+def test_loads(app):
+    assert app.json.loads('{"ruta": "Chilpancingo → CDMX", "precio": 450}') == \
+        {'ruta': 'Chilpancingo → CDMX', 'precio': 450}
+
+
+def test_tipo_desconocido_es_error(app):
+    with pytest.raises(TypeError):
+        app.json.dumps({'x': object()})
+
+
+def test_nombre_ruta_recarga_la_tabla_si_no_conoce_el_id(crear_app):
+    app = crear_app()
+    with app.app_context():
+        db.session.add(Rutas(id=1, origen='Chilpancingo', destino='CDMX', duracion_estimada_min=210))
+        db.session.commit()
+        assert nombre_ruta(1) == 'Chilpancingo → CDMX'
+
+        # Ya en cache: no vuelve a la BD
+        db.session.get(Rutas, 1).origen = 'Tixtla'
+        db.session.commit()
+        assert nombre_ruta(1) == 'Chilpancingo → CDMX'
+
+        # Ruta creada por otro worker: el id desconocido recarga la tabla
+        db.session.add(Rutas(id=2, origen='Acapulco', destino='Taxco', duracion_estimada_min=240))
+        db.session.commit()
+        assert nombre_ruta(2) == 'Acapulco → Taxco'
+        assert nombre_ruta(3) is None
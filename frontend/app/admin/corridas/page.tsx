@@ -2,6 +2,7 @@
 import React, { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation'; 
 import { Ruta, Corrida } from '../../types'; // Usamos rutas relativas
+import { guardarPinPrimaria, headersLectura } from '@/lib/leerPrimaria';
 export const dynamic = 'force-dynamic';
 // --- Tipos de datos locales ---
 type NuevaCorridaForm = {
@@ -56,7 +57,7 @@ export default function AdminCorridasPage() {
             headers: { 'Authorization': `Bearer ${token}` }
           }),
           fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/admin/corridas`, {
-            headers: { 'Authorization': `Bearer ${token}` }
+            headers: { 'Authorization': `Bearer ${token}`, ...headersLectura() }
           })
         ]);
 
@@ -145,6 +146,7 @@ export default function AdminCorridasPage() {
           capacidad: parseInt(formState.capacidad)
         })
       });
+      guardarPinPrimaria(res);
 
       const responseData = await res.json();
 
@@ -186,6 +188,7 @@ export default function AdminCorridasPage() {
         method: 'DELETE',
         headers: { 'Authorization': `Bearer ${token}` }
       });
+      guardarPinPrimaria(res);
       const data = await res.json();
       if (!res.ok) { throw new Error(data.error || 'No se pudo cancelar la corrida'); }
       setCorridas(corridas.filter(corrida => corrida.id !== corridaId));
@@ -2,6 +2,7 @@
 import React, { useEffect, useState } from 'react';
 import { AsientosInfo, ReservaState, Pasajero } from '../types'; // Importamos los tipos
 import { useRouter } from 'next/navigation'; // Necesario para useRouter
+import { guardarPinPrimaria, headersLectura } from '@/lib/leerPrimaria';
 
 // --- Props ---
 interface Props {
@@ -29,7 +30,9 @@ export default function PantallaAsientos({ reserva, setReserva, setPantalla }: P
       setError(null);
       try {
         // La API ahora devuelve asientos OCUPADOS Y BLOQUEADOS
-        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}//api/asientos?corrida_id=${reserva.corrida!.id}`);
+        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}//api/asientos?corrida_id=${reserva.corrida!.id}`, {
+          headers: headersLectura(),
+        });
         const data: AsientosInfo = await res.json();
 
         if (!res.ok) {
@@ -109,6 +112,7 @@ export default function PantallaAsientos({ reserva, setReserva, setPantalla }: P
           asientos: reserva.asientos,
         }),
       });
+      guardarPinPrimaria(res);
 
       const data = await res.json();
 
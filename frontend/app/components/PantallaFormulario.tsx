@@ -2,6 +2,7 @@
 import React, { useState } from 'react';
 import { useRouter } from 'next/navigation'; 
 import { ReservaState, Pasajero } from '../types'; // Ruta relativa
+import { guardarPinPrimaria } from '@/lib/leerPrimaria';
 
 // --- Props ---
 interface Props {
@@ -48,6 +49,7 @@ export default function PantallaFormulario({ reserva, onFormChange, onRegresar }
           pasajeros: pasajerosArray,
         }),
       });
+      guardarPinPrimaria(res);
 
       const data = await res.json();
 
@@ -2,6 +2,7 @@
 import React, { useEffect, useState, useRef } from 'react';
 import Link from 'next/link';
 import { useSearchParams } from 'next/navigation';
+import { headersLectura } from '@/lib/leerPrimaria';
 
 export default function PagoExitosoCliente() {
   const searchParams = useSearchParams();
@@ -25,7 +26,9 @@ export default function PagoExitosoCliente() {
       try {
         // Usamos la variable de entorno para la URL de la API
         const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5000';
-        const res = await fetch(`${API_URL}/api/estado-reserva-por-session?session_id=${sessionId}`);
+        const res = await fetch(`${API_URL}/api/estado-reserva-por-session?session_id=${sessionId}`, {
+          headers: headersLectura(),
+        });
         const data = await res.json();
 
         if (!res.ok) {
@@ -0,0 +1,19 @@
+// Read-your-writes con la réplica del backend: después de una escritura el backend
+// manda un token en 'X-Leer-Primaria'; lo reenviamos en las lecturas siguientes
+// para que se sirvan desde la BD principal (el token caduca solo en el backend).
+
+const HEADER_PIN = "X-Leer-Primaria"
+const CLAVE = "leer_primaria"
+
+export function guardarPinPrimaria(res: Response) {
+  const token = res.headers.get(HEADER_PIN)
+  if (token && typeof window !== "undefined") {
+    sessionStorage.setItem(CLAVE, token)
+  }
+}
+
+export function headersLectura(): Record<string, string> {
+  if (typeof window === "undefined") return {}
+  const token = sessionStorage.getItem(CLAVE)
+  return token ? { [HEADER_PIN]: token } : {}
+}